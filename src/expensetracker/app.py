@@ -8,10 +8,19 @@ from toga.style.pack import COLUMN, ROW
 from toga.widgets import box, label
 
 from .main import MainScreen
-from .database import ExpenseTracker
+from .async_database import AsyncExpenseTracker
+from .database import DEFAULT_STORAGE_PROFILE, ExpenseTracker
+from .write_queue import WriteQueue
 
 
 class ExpenseTrackerApp(toga.App):
+    # Storage profile for the main database ("durable", "balanced" or "fast").
+    # Can be overridden with the EXPENSETRACKER_STORAGE_PROFILE environment variable.
+    storage_profile = DEFAULT_STORAGE_PROFILE
+    # Memory cap in bytes for the opt-in read cache; None leaves it off.
+    # Can be overridden with the EXPENSETRACKER_QUERY_CACHE_BYTES environment variable.
+    query_cache_bytes = None
+
     def startup(self):
         try:
             print("Starting ExpenseTracker application...")
@@ -21,9 +30,24 @@ class ExpenseTrackerApp(toga.App):
             print("Main window created")
 
             # Initialize the database with the app instance
-            self.database = ExpenseTracker(self)
+            storage_profile = os.environ.get('EXPENSETRACKER_STORAGE_PROFILE', self.storage_profile)
+            query_cache_bytes = int(os.environ.get('EXPENSETRACKER_QUERY_CACHE_BYTES', self.query_cache_bytes or 0))
+            self.database = ExpenseTracker(
+                self, storage_profile=storage_profile, query_cache_bytes=query_cache_bytes)
             print("Database initialized successfully")
 
+            # Change events are delivered on the app's loop, once per turn
+            self.database.events.loop = self.loop
+
+            # Screens load their data through the database thread, whose
+            # writes are reported on the same events
+            self.async_database = AsyncExpenseTracker(
+                self, storage_profile=storage_profile, query_cache_bytes=query_cache_bytes,
+                events=self.database.events)
+            # Expense and family writes are committed in groups
+            self.write_queue = WriteQueue(self.async_database)
+            self.on_exit = self.shutdown_database
+
             # Create the main screen
             main_screen = MainScreen('main', self)
             print("Main screen created")
@@ -40,6 +64,15 @@ class ExpenseTrackerApp(toga.App):
                     f"Error initializing application: {str(e)}"
                 )
 
+    def shutdown_database(self, app, **kwargs):
+        """Commit queued writes and close the database thread before the app exits."""
+        try:
+            self.write_queue.close()
+            self.async_database.close()
+        except Exception as e:
+            print(f"Error closing database thread: {e}")
+        return True
+
 
 def main():
     return ExpenseTrackerApp(
@@ -0,0 +1,65 @@
+"""
+Asynchronous access to the expense tracker database.
+
+Queries run on a single dedicated database thread, which gets its own
+connection from the tracker's ConnectionManager, so Toga handlers can await them without blocking the UI thread.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .database import DEFAULT_STORAGE_PROFILE, ExpenseTracker
+
+
+class AsyncExpenseTracker:
+    """Awaitable facade over ExpenseTracker.
+
+    Any ExpenseTracker method can be called on this object; it runs on the
+    database thread and returns an awaitable for its result::
+
+        active_trip = await app.async_database.get_active_trip()
+    """
+
+    def __init__(self, app=None, db_path=None, storage_profile=DEFAULT_STORAGE_PROFILE, query_cache_bytes=None,
+                 events=None):
+        self.database = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='expensetracker-db')
+        # Open the connection on the database thread so it is only ever used there
+        self._executor.submit(self._open, app, db_path, storage_profile, query_cache_bytes, events).result()
+
+    def _open(self, app, db_path, storage_profile, query_cache_bytes, events):
+        self.database = ExpenseTracker(
+            app, db_path=db_path, storage_profile=storage_profile, query_cache_bytes=query_cache_bytes,
+            events=events)
+
+    def _close(self):
+        self.database.close()
+        self.database = None
+
+    def submit(self, function, *args, **kwargs):
+        """Run ``function(database, *args, **kwargs)`` on the database thread.
+
+        Returns a concurrent.futures.Future for the result.
+        """
+        return self._executor.submit(lambda: function(self.database, *args, **kwargs))
+
+    def run(self, function, *args, **kwargs):
+        """Like submit, but returns an awaitable for use in async handlers."""
+        return asyncio.wrap_future(self.submit(function, *args, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(ExpenseTracker, name)
+        if not callable(method):
+            raise AttributeError(name)
+
+        @functools.wraps(method)
+        def call(*args, **kwargs):
+            return self.run(lambda database: getattr(database, name)(*args, **kwargs))
+
+        return call
+
+    def close(self):
+        """Finish queued queries and close the database thread's connection."""
+        if self.database is not None:
+            self._executor.submit(self._close).result()
+        self._executor.shutdown(wait=True)
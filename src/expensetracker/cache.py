@@ -0,0 +1,187 @@
+"""
+Optional result cache for ExpenseTracker reads.
+
+Read methods are tagged with the tables they depend on using
+``@cached_read``, and write methods with the tables they change using
+``@invalidates``. While a QueryCache is attached to a tracker, repeated
+reads are answered from memory until a write touches one of their tables,
+or another connection commits (detected with PRAGMA data_version).
+Without a cache attached, both decorators just call through.
+"""
+import functools
+import sys
+from collections import OrderedDict
+
+# Default memory cap for cached results, in bytes
+DEFAULT_CACHE_BYTES = 4 * 1024 * 1024
+
+
+def _estimate_size(value):
+    """Rough memory footprint of a query result (rows of plain values)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += _estimate_size(item)
+    return size
+
+
+class QueryCache:
+    """LRU cache of query results with a memory cap and per-table invalidation."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.data_version = None
+        self._entries = OrderedDict()  # key -> (value, size, tables)
+        self._keys_by_table = {}
+        # Tables of the write methods running now, and the connection's
+        # total_changes when their reads were last known to be current
+        self._writes = []
+        self._changes = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (True, value) for a cached key, or (False, None)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        value = entry[0]
+        # Callers may modify the lists they get back
+        return True, list(value) if isinstance(value, list) else value
+
+    def put(self, key, value, tables):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._discard(key)
+        self._entries[key] = (list(value) if isinstance(value, list) else value, size, tables)
+        self.current_bytes += size
+        for table in tables:
+            self._keys_by_table.setdefault(table, set()).add(key)
+        while self.current_bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, *tables):
+        """Drop every cached result that depends on any of the given tables."""
+        for table in tables:
+            for key in self._keys_by_table.pop(table, ()):
+                if key in self._entries:
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._keys_by_table.clear()
+        self.current_bytes = 0
+
+    def begin_write(self, tables, total_changes):
+        """Note that a write method touching ``tables`` has started."""
+        # An enclosing write method may already have written
+        self.check_changes(total_changes)
+        self._writes.append(tables)
+        self._changes = total_changes
+
+    def end_write(self):
+        """Drop the finished write method's tables."""
+        self.invalidate(*self._writes.pop())
+
+    def check_changes(self, total_changes):
+        """Drop the tables of running write methods once they have written.
+
+        Write methods often read again after writing, or report the write
+        to observers that do; those reads must not see results from before it.
+        """
+        if self._writes and total_changes != self._changes:
+            for tables in self._writes:
+                self.invalidate(*tables)
+            self._changes = total_changes
+
+    def check_data_version(self, data_version):
+        """Clear the cache if another connection has committed since the last check."""
+        if data_version != self.data_version:
+            if self.data_version is not None:
+                self.clear()
+            self.data_version = data_version
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    def _discard(self, key):
+        _, size, tables = self._entries.pop(key)
+        self.current_bytes -= size
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+    def __repr__(self):
+        return (
+            f"<QueryCache entries={len(self._entries)} bytes={self.current_bytes} "
+            f"hits={self.hits} misses={self.misses}>"
+        )
+
+
+def cached_read(*tables):
+    """Cache a read method's result, keyed on its arguments, until ``tables`` change."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.query_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+
+            cache.check_data_version(self.conn.execute("PRAGMA data_version").fetchone()[0])
+            cache.check_changes(self.conn.total_changes)
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = method(self, *args, **kwargs)
+            cache.put(key, value, tables)
+            return value
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Drop cached reads of ``tables`` as soon as a write method has written.
+
+    Reads inside the method after its write see fresh results, and the
+    tables are dropped again when it returns, even if it fails.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.query_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            cache.begin_write(tables, self.conn.total_changes)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                cache.end_write()
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+"""
+Per-thread SQLite connections to one database file.
+
+A sqlite3 connection, and any cursor on it, must not be used by two
+threads at once. ConnectionManager opens a connection for each thread the
+first time that thread asks for one and hands the same connection back to
+it afterwards, so screens, the database thread and background workers can
+all read while one of them writes. Every connection is configured the
+same way when it is opened.
+"""
+import sqlite3
+import threading
+
+# Seconds a connection waits for another connection's write lock
+DEFAULT_BUSY_TIMEOUT = 5.0
+
+
+class ConnectionManager:
+    def __init__(self, db_path, configure=None, timeout=DEFAULT_BUSY_TIMEOUT):
+        self.db_path = db_path
+        self.configure = configure
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread -> connection
+
+    def get(self):
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+        return conn
+
+    def _open(self):
+        # Each connection is only used by the thread that opened it;
+        # check_same_thread is off so close_all can close them from any thread
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        if self.configure is not None:
+            self.configure(conn)
+        self._local.conn = conn
+        with self._lock:
+            self._connections[threading.current_thread()] = conn
+            # Close connections left behind by threads that have finished
+            for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                self._connections.pop(thread).close()
+        print(f"Opened database connection for thread {threading.current_thread().name}")
+        return conn
+
+    def close(self):
+        """Close the calling thread's connection; the next get() opens a new one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.current_thread(), None)
+        conn.close()
+
+    def close_all(self):
+        """Close every thread's connection."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def __len__(self):
+        return len(self._connections)
+
+    def __repr__(self):
+        return f"<ConnectionManager {self.db_path!r} connections={len(self)}>"
@@ -1,6 +1,19 @@
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
+
+from .cache import QueryCache, cached_read, invalidates
+from .connection import ConnectionManager
+from .migrations import FAMILY_BALANCES_QUERY, TRIP_TOTALS_QUERY, bootstrap_schema
+from .observable import (ExpenseAdded, ExpenseDeleted, ExpensesReset, ExpenseTrackerObservable, FamilyChanged,
+                         TripChanged, TripSwitched)
+from .records import Expense, Family, Trip, select_list
+from .settlement_engine import DEFAULT_STRATEGY
+from .settlement_service import SettlementService
+from .snapshot import TripSnapshot
 
 
 
@@ -8,8 +21,79 @@ import os
 
 import os
 
+# Pages copied per step when archiving with the backup API
+ARCHIVE_PAGE_STEP = 256
+
+# Rows inserted per transaction by import_expenses
+IMPORT_CHUNK_SIZE = 500
+
+# Default number of rows returned by get_expenses_page
+EXPENSE_PAGE_LIMIT = 100
+
+# Rows fetched at a time by the iter_* methods
+ITER_CHUNK_SIZE = 500
+
+# Expenses with the paying family's name, in the column order of Expense
+EXPENSE_QUERY = '''
+    SELECT expenses.id, expenses.trip_id, expenses.name, expenses.amount, expenses.date,
+           expenses.payer_id, COALESCE(family_details.family_name, 'Unknown') AS payer_name
+    FROM expenses
+    LEFT JOIN family_details ON expenses.payer_id = family_details.id
+'''
+
+# Connection settings applied together when the database is opened.
+# cache_size is in KiB when negative; mmap_size is in bytes.
+STORAGE_PROFILES = {
+    # Every commit is flushed to disk before it returns
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+    },
+    # Commits survive an app crash; a power cut may lose the last few
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    # No fsync at all; for bulk work where the data can be rebuilt
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -16000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+DEFAULT_STORAGE_PROFILE = 'balanced'
+
+
+class _ThreadState(threading.local):
+    """What an ExpenseTracker keeps per thread, next to that thread's connection.
+
+    Transactions, cached reads, snapshots and settlement services all
+    belong to one connection, so each thread has its own.
+    """
+
+    def __init__(self, query_cache_bytes):
+        self.transaction_depth = 0
+        # Opt-in read cache; None means every read goes to SQLite
+        self.query_cache = QueryCache(query_cache_bytes) if query_cache_bytes else None
+        self.snapshots = {}
+        self.snapshot_version = None
+        self.settlement_services = {}
+        # Events of the open transaction, sent to shared observers on commit
+        self.pending_events = []
+
+
 class ExpenseTracker:
-    def __init__(self, app=None, db_path=None):
+    def __init__(self, app=None, db_path=None, storage_profile=DEFAULT_STORAGE_PROFILE, query_cache_bytes=None,
+                 events=None):
         try:
             # Use app.paths.app if app is provided, otherwise use db_path
             if app:
@@ -25,15 +109,22 @@ class ExpenseTracker:
             # Ensure the directory exists
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-            # Connect to the database
-            self.conn = sqlite3.connect(self.db_path)
-            self.cursor = self.conn.cursor()
+            # Each thread gets its own connection and its own state on top of it
+            if storage_profile not in STORAGE_PROFILES:
+                raise ValueError(f"Unknown storage profile: {storage_profile}")
+            self.storage_profile = storage_profile
+            self._state = _ThreadState(query_cache_bytes)
+            # Change events from every write; trackers may share one
+            self.events = events if events is not None else ExpenseTrackerObservable(self)
+            self.connections = ConnectionManager(self.db_path, configure=self._configure_connection)
+            print(f"Using storage profile: {storage_profile}")
 
-            # Create tables
-            self.create_trips_table()
-            self.create_expenses_table()
-            self.create_family_details_table()
-            self.create_archived_trips_table()
+            # Create the tables or bring them up to date; a no-op once current
+            bootstrap_schema(self.conn)
+
+            # Move trips from old archive files into the main database
+            if app:
+                self.migrate_archive_files()
 
             print("Database initialized successfully")
 
@@ -46,92 +137,177 @@ class ExpenseTracker:
 
 
 
-    def create_trips_table(self):
-        try:
-            # SQL query formatted for better readability
-            create_table_query = '''
-            CREATE TABLE IF NOT EXISTS trips (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                start_date DATE,
-                trip_type TEXT,
-                family_name TEXT,
-                individual_name TEXT,
-                num_family_members INTEGER,
-                status TEXT DEFAULT 'INACTIVE'
-            )
-            '''
-
-            # Execute the create table query
-            self.cursor.execute(create_table_query)
-            self.conn.commit()
-            print("Trips table created successfully")
+    @property
+    def conn(self):
+        """The calling thread's connection, opened on first use."""
+        return self.connections.get()
 
-            # Verify table creation by trying to select from it
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trips'")
-            if self.cursor.fetchone():
-                print("Verified: trips table exists")
+    @property
+    def query_cache(self):
+        """The calling thread's read cache; None means every read goes to SQLite."""
+        return self._state.query_cache
 
-        except sqlite3.Error as e:
-            print(f"Error creating trips table: {str(e)}")
-            # Optionally show error in UI if available
-            if hasattr(self, 'main_window'):
-                self.main_window.info_dialog(
-                    "Database Error",
-                    f"Failed to create trips table: {str(e)}"
-                )
-            raise  # Re-raise the exception for higher-level handling
+    def _configure_connection(self, conn):
+        settings = STORAGE_PROFILES[self.storage_profile]
+        conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {settings['cache_size']}")
+        conn.execute(f"PRAGMA mmap_size = {settings['mmap_size']}")
+        conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
 
-        except Exception as e:
-            print(f"Unexpected error creating trips table: {str(e)}")
+    def apply_storage_profile(self, storage_profile):
+        """Apply the journal, sync, cache, mmap and temp store settings of a profile.
+
+        The calling thread's connection switches now; other threads pick the
+        profile up when they next open a connection.
+        """
+        if storage_profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {storage_profile}")
+        self.conn.commit()
+        self.storage_profile = storage_profile
+        self._configure_connection(self.conn)
+        print(f"Using storage profile: {storage_profile}")
+
+    def _commit(self):
+        """Commit, unless the write is part of a transaction that commits later."""
+        if not self._state.transaction_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of writes as one transaction::
+
+            with database.transaction():
+                database.end_trip(old_trip_id)
+                database.save_trip(...)
+
+        Write methods called inside the block skip their own commit, and the
+        outermost block commits once when it ends. A nested block runs in a
+        savepoint: if it raises, only its own writes are rolled back before
+        the exception reaches the enclosing block. If the outermost block
+        raises, everything it wrote is rolled back.
+        """
+        state = self._state
+        if state.transaction_depth:
+            savepoint = f'transaction_{state.transaction_depth}'
+            self.conn.execute(f'SAVEPOINT {savepoint}')
+        else:
+            savepoint = None
+            self.conn.commit()
+            self.conn.execute('BEGIN')
+            state.pending_events = []
+        first_event = len(state.pending_events)
+        state.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            state.transaction_depth -= 1
+            if savepoint:
+                self.conn.execute(f'ROLLBACK TO {savepoint}')
+                self.conn.execute(f'RELEASE {savepoint}')
+            else:
+                self.conn.rollback()
+            # The rolled-back writes never happened as far as other observers know
+            del state.pending_events[first_event:]
+            # Reads cached inside the transaction may no longer be true
+            if state.query_cache is not None:
+                state.query_cache.clear()
+            state.snapshots = {}
+            state.snapshot_version = None
+            self.events.notify_local(ExpensesReset(None))
             raise
+        state.transaction_depth -= 1
+        if savepoint:
+            self.conn.execute(f'RELEASE {savepoint}')
+        else:
+            self.conn.commit()
+            events, state.pending_events = state.pending_events, []
+            self.events.notify_shared(*events)
+
+    def _emit(self, *events):
+        """Report the events of a write to observers.
+
+        Observers on this thread's connection hear about it at once; the
+        rest only after the enclosing transaction, if any, commits.
+        """
+        state = self._state
+        if state.transaction_depth:
+            self.events.notify_local(*events)
+            state.pending_events.extend(events)
+        else:
+            self.events.notify_observers(*events)
+
+    def _iter_rows(self, query, params=(), chunk_size=ITER_CHUNK_SIZE, record=None):
+        """Yield the rows of a query from its own cursor, ``chunk_size`` at a time.
+
+        Other queries can run while the generator is suspended, since it does
+        not share a cursor with them. If ``record`` is given, rows are
+        yielded as instances of that record type.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                if record is not None:
+                    rows = map(record._make, rows)
+                yield from rows
+        finally:
+            cursor.close()
 
     def initialize_database(self):
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.cursor = self.conn.cursor()
-            self.create_trips_table()
+            # Reopen this thread's connection
+            self.connections.close()
+            bootstrap_schema(self.conn)
             print(f"Database initialized at: {self.db_path}")
         except Exception as e:
             print(f"Database initialization failed: {str(e)}")
             raise
 
     def get_connection(self):
-        """Get the current database connection or create a new one if needed"""
+        """Get this thread's database connection, reopening it if it was closed"""
         try:
             # Test if connection is active
             self.conn.cursor()
-            return self.conn
-        except (sqlite3.Error, AttributeError):
+        except sqlite3.Error:
             # Reconnect if connection is closed or invalid
-            self.conn = sqlite3.connect(self.db_path)
-            return self.conn
+            self.connections.close()
+        return self.conn
+
+    def close(self):
+        """Close the connections of every thread"""
+        if len(self.connections):
+            self.connections.close_all()
+            print("Database connections closed")
 
     def __del__(self):
-        """Ensure database connection is properly closed"""
+        """Ensure database connections are properly closed"""
         try:
-            if hasattr(self, 'conn') and self.conn:
-                self.conn.close()
-                print("Database connection closed")
+            if hasattr(self, 'connections'):
+                self.close()
         except Exception as e:
             print(f"Error closing database connection: {e}")
 
-    def create_archived_trips_table(self):
-        self.cursor.execute('''  
-        CREATE TABLE IF NOT EXISTS archived_trips (  
-           id INTEGER PRIMARY KEY AUTOINCREMENT,  
-           trip_name TEXT NOT NULL,  
-           archive_path TEXT NOT NULL,  
-           archived_date TEXT NOT NULL  
-        );  
-      ''')
-        self.conn.commit()
+    @invalidates('archived_trips')
+    def archive_trip(self, trip_id=None, progress=None):
+        """Export a trip (the active one by default) to an archive file.
 
-    def archive_trip(self):
+        The copy uses SQLite's online backup API in steps of
+        ARCHIVE_PAGE_STEP pages. If given, ``progress(copied_pages,
+        total_pages)`` is called after each step. Trips stay in the main
+        database, so the archive is only an export.
+        """
+        cursor = self.conn.cursor()
         try:
+            if trip_id is None:
+                trip_id = self.get_active_trip_id()
+
             # Get the trip name
-            self.cursor.execute("SELECT name FROM trips WHERE id = (SELECT MAX(id) FROM trips)")
-            result = self.cursor.fetchone()
+            cursor.execute("SELECT name FROM trips WHERE id = ?", (trip_id,))
+            result = cursor.fetchone()
             trip_name = result[0] if result else "Unnamed Trip"
 
             # Create archives directory in app's private storage
@@ -139,113 +315,55 @@ class ExpenseTracker:
             if not os.path.exists(archives_dir):
                 os.makedirs(archives_dir)
 
-            # Create archive file path
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            archive_filename = f"trip_archive_{timestamp}.db"
+            # Create archive file path; the trip id and microseconds keep
+            # two exports made within the same second apart
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            archive_filename = f"trip_archive_{trip_id}_{timestamp}.db"
             archive_path = os.path.join(archives_dir, archive_filename)
+            if os.path.exists(archive_path):
+                # backup() would overwrite another archive
+                raise FileExistsError(f"Archive already exists: {archive_path}")
 
             print(f"Creating archive at: {archive_path}")
 
+            # Make sure pending writes are part of the snapshot
+            self.conn.commit()
+
+            def report_progress(status, remaining, total):
+                if progress:
+                    progress(total - remaining, total)
+
+            archive_conn = sqlite3.connect(archive_path)
             try:
-                # Create and initialize archive database
-                archive_conn = sqlite3.connect(archive_path)
-                archive_cur = archive_conn.cursor()
-
-                # Enable foreign keys in the archive database
-                archive_cur.execute("PRAGMA foreign_keys = ON")
-
-                # Create tables in archive database
-                archive_cur.executescript('''  
-                    CREATE TABLE IF NOT EXISTS trips (  
-                        id INTEGER PRIMARY KEY,  
-                        name TEXT,  
-                        start_date DATE,  
-                        trip_type TEXT,  
-                        family_name TEXT,  
-                        individual_name TEXT,  
-                        num_family_members INTEGER,  
-                        status TEXT DEFAULT 'INACTIVE'  
-                    );  
-
-                    CREATE TABLE IF NOT EXISTS expenses (  
-                        id INTEGER PRIMARY KEY,  
-                        trip_id INTEGER,  
-                        name TEXT,  
-                        amount REAL,  
-                        date DATE,  
-                        trip_type TEXT,  
-                        payer_id INTEGER,  
-                        FOREIGN KEY (trip_id) REFERENCES trips (id)  
-                    );  
-
-                    CREATE TABLE IF NOT EXISTS family_details (  
-                        id INTEGER PRIMARY KEY,  
-                        name TEXT,  
-                        members INTEGER  
-                    );  
-                ''')
-
-                # Begin transaction for data copy
-                archive_conn.execute('BEGIN TRANSACTION')
-
-                try:
-                    # Copy trips data
-                    print("Copying trips data...")
-                    self.cursor.execute("SELECT * FROM trips")
-                    trips = self.cursor.fetchall()
-                    for trip in trips:
-                        archive_cur.execute('''  
-                            INSERT INTO trips (id, name, start_date, trip_type, family_name, 
-                                            individual_name, num_family_members, status)  
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)  
-                        ''', trip)
-
-                    # Copy expenses data
-                    print("Copying expenses data...")
-                    self.cursor.execute("SELECT * FROM expenses")
-                    expenses = self.cursor.fetchall()
-                    for expense in expenses:
-                        archive_cur.execute('''  
-                            INSERT INTO expenses (id, trip_id, name, amount, date, trip_type, payer_id)  
-                            VALUES (?, ?, ?, ?, ?, ?, ?)  
-                        ''', expense)
-
-                    # Copy family details data
-                    print("Copying family details...")
-                    self.cursor.execute("SELECT id, family_name, num_members FROM family_details")
-                    family_details = self.cursor.fetchall()
-                    for family in family_details:
-                        archive_cur.execute('''  
-                            INSERT INTO family_details (id, name, members)  
-                            VALUES (?, ?, ?)  
-                        ''', family)
-
-                    # Record archive in main database
-                    archived_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    self.cursor.execute('''  
-                        INSERT INTO archived_trips (trip_name, archive_path, archived_date)  
-                        VALUES (?, ?, ?)  
-                    ''', (trip_name, archive_filename, archived_date))
-
-                    # Commit both transactions
-                    archive_conn.commit()
-                    self.conn.commit()
-                    print("Archive created successfully")
-
-                except sqlite3.Error as e:
-                    # Rollback both transactions on error
-                    archive_conn.rollback()
-                    self.conn.rollback()
-                    print(f"Error during data copy: {e}")
-                    raise
+                self.conn.backup(archive_conn, pages=ARCHIVE_PAGE_STEP, progress=report_progress)
+
+                # A standalone export does not need the live WAL files
+                archive_conn.execute("PRAGMA journal_mode = DELETE")
 
+                # Keep only the exported trip in the archive
+                archive_conn.execute("DROP TABLE IF EXISTS archived_trips")
+                archive_conn.execute("DELETE FROM trips WHERE id IS NOT ?", (trip_id,))
+                archive_conn.execute("DELETE FROM expenses WHERE trip_id IS NOT ?", (trip_id,))
+                archive_conn.execute("DELETE FROM family_details WHERE trip_id IS NOT ?", (trip_id,))
+                archive_conn.commit()
+
+                # Give back the pages the other trips used
+                archive_conn.execute("VACUUM")
             except sqlite3.Error as e:
                 print(f"Database error during archiving: {e}")
+                archive_conn.close()
+                os.remove(archive_path)
                 raise
-            finally:
-                # Ensure archive connection is closed
-                if 'archive_conn' in locals():
-                    archive_conn.close()
+            archive_conn.close()
+
+            # Record archive in main database
+            archived_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute('''
+                INSERT INTO archived_trips (trip_name, archive_path, archived_date, trip_id)
+                VALUES (?, ?, ?, ?)
+            ''', (trip_name, archive_filename, archived_date, trip_id))
+            self.conn.commit()
+            print("Archive created successfully")
 
             return archive_filename  # Return just the filename, not the full path
 
@@ -257,144 +375,281 @@ class ExpenseTracker:
         """Helper method to get the full path of an archive file"""
         return os.path.join(self.app.paths.app, "archives", archive_filename)
 
+    @cached_read('trips')
     def get_active_trip(self):
-        self.cursor.execute('SELECT * FROM trips  WHERE status = "active"')
-        return self.cursor.fetchone()
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {select_list(Trip)} FROM trips WHERE status = 'active'")
+        trip = cursor.fetchone()
+        return Trip._make(trip) if trip else None
+
+    @cached_read('trips')
+    def get_trip(self, trip_id):
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {select_list(Trip)} FROM trips WHERE id = ?", (trip_id,))
+        trip = cursor.fetchone()
+        return Trip._make(trip) if trip else None
 
     def load_archived_trip(self, archive_path):
-        archive_conn = sqlite3.connect(archive_path)
-        archive_cursor = archive_conn.cursor()
-
-        self.clear_trips()
-        self.clear_expenses()
-        self.clear_family_details()
-
-        archive_cursor.execute("SELECT * FROM trips")
-        trips = archive_cursor.fetchall()
-        for trip in trips:
-            self.cursor.execute('''  
-           INSERT INTO trips (id, name, start_date, trip_type, family_name, individual_name, num_family_members, status)  
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)  
-        ''', trip)
-
-        archive_cursor.execute("SELECT * FROM expenses")
-        expenses = archive_cursor.fetchall()
-        for expense in expenses:
-            self.cursor.execute('''  
-           INSERT INTO expenses (id, trip_id, name, amount, date, trip_type, payer_id)  
-           VALUES (?, ?, ?, ?, ?, ?, ?)  
-        ''', expense)
-
-        archive_cursor.execute("SELECT id, name, members FROM family_details")
-        family_details = archive_cursor.fetchall()
-        for family in family_details:
-            self.cursor.execute('''  
-           INSERT INTO family_details (id, name, members)  
-           VALUES (?, ?, ?)  
-        ''', family)
+        """Import an archive file and make its trip the active one."""
+        return self.import_archive(archive_path, activate=True)
+
+    @invalidates('trips', 'family_details', 'expenses', 'archived_trips')
+    def import_archive(self, archive_path, activate=False, ended_date=None, archive_id=None):
+        """Copy the trip held in an archive file into the main database.
+
+        The archive is attached and copied with INSERT ... SELECT in a single
+        transaction, so a failed import leaves the live data untouched.
+        Families get fresh ids so they cannot clash with other trips, and
+        expenses are re-pointed at them. Returns the new trip id.
+        """
+        cursor = self.conn.cursor()
+        if not os.path.isabs(archive_path) and hasattr(self, 'app'):
+            archive_path = self.get_archive_path(archive_path)
+        if not os.path.exists(archive_path):
+            raise FileNotFoundError(f"Archive not found: {archive_path}")
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        status = 'active' if activate else 'archived'
+        if activate:
+            ended_date = None
+        elif ended_date is None:
+            ended_date = now
 
         self.conn.commit()
-        archive_conn.close()
+        cursor.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        try:
+            # Archives made before the backup API store families as name/members
+            cursor.execute("PRAGMA archive.table_info(family_details)")
+            family_columns = [row[1] for row in cursor.fetchall()]
+            if 'family_name' in family_columns:
+                name_column, members_column = 'family_name', 'num_members'
+            else:
+                name_column, members_column = 'name', 'members'
 
+            self.conn.execute('BEGIN')
+            try:
+                if activate:
+                    cursor.execute(
+                        "UPDATE trips SET status = 'archived', ended_date = ? WHERE status = 'active'",
+                        (now,))
+
+                cursor.execute('''
+                    INSERT INTO trips (name, start_date, trip_type, family_name, individual_name,
+                                       num_family_members, status, ended_date)
+                    SELECT name, start_date, trip_type, family_name, individual_name,
+                           num_family_members, ?, ?
+                    FROM archive.trips
+                    ORDER BY status = 'active' DESC, id DESC
+                    LIMIT 1
+                ''', (status, ended_date))
+                if cursor.rowcount == 0:
+                    raise ValueError("Archive does not contain a trip")
+                trip_id = cursor.lastrowid
+
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM family_details")
+                family_id_offset = cursor.fetchone()[0]
+                cursor.execute(f'''
+                    INSERT INTO family_details (id, family_name, num_members, trip_id)
+                    SELECT id + ?, {name_column}, {members_column}, ?
+                    FROM archive.family_details
+                ''', (family_id_offset, trip_id))
+                cursor.execute('''
+                    INSERT INTO expenses (trip_id, name, amount, date, trip_type, payer_id)
+                    SELECT ?, name, amount, date, trip_type, payer_id + ?
+                    FROM archive.expenses
+                    ORDER BY id
+                ''', (trip_id, family_id_offset))
+
+                if archive_id is not None:
+                    cursor.execute(
+                        "UPDATE archived_trips SET trip_id = ? WHERE id = ?", (trip_id, archive_id))
+                self.conn.commit()
+            except (sqlite3.Error, ValueError) as e:
+                self.conn.rollback()
+                print(f"Error importing archive: {e}")
+                raise
+        finally:
+            cursor.execute("DETACH DATABASE archive")
+
+        self._emit(
+            TripChanged(trip_id), FamilyChanged(trip_id, None), ExpensesReset(trip_id),
+            *([TripSwitched(trip_id)] if activate else []))
+        return trip_id
+
+    def migrate_archive_files(self):
+        """Import archive files written before trips were kept in the main database."""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT id, archive_path, archived_date FROM archived_trips WHERE trip_id IS NULL")
+        for archive_id, archive_path, archived_date in cursor.fetchall():
+            if not os.path.isabs(archive_path) and hasattr(self, 'app'):
+                archive_path = self.get_archive_path(archive_path)
+            if not os.path.exists(archive_path):
+                continue
+            try:
+                self.import_archive(archive_path, ended_date=archived_date, archive_id=archive_id)
+                print(f"Migrated archive: {archive_path}")
+            except Exception as e:
+                print(f"Error migrating archive {archive_path}: {e}")
+
+    @invalidates('trips')
+    def end_trip(self, trip_id):
+        """Mark a trip as ended; its data stays in place."""
+        cursor = self.conn.cursor()
+        ended_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute(
+            "UPDATE trips SET status = 'archived', ended_date = ? WHERE id = ?",
+            (ended_date, trip_id))
+        self._commit()
+        self._emit(TripChanged(trip_id), TripSwitched(self.get_active_trip_id()))
+
+    @invalidates('trips')
+    def reactivate_trip(self, trip_id):
+        """Make an ended trip the active one, ending the current trip."""
+        cursor = self.conn.cursor()
+        # Check first, so an unknown id does not leave no trip active
+        cursor.execute("SELECT 1 FROM trips WHERE id = ?", (trip_id,))
+        if cursor.fetchone() is None:
+            raise ValueError(f"Trip not found: {trip_id}")
+        ended_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.execute(
+            "UPDATE trips SET status = 'archived', ended_date = ? WHERE status = 'active' AND id != ?",
+            (ended_date, trip_id))
+        cursor.execute(
+            "UPDATE trips SET status = 'active', ended_date = NULL WHERE id = ?", (trip_id,))
+        self._commit()
+        self._emit(TripSwitched(trip_id))
+
+    @cached_read('trips')
+    def get_ended_trips(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, name, start_date, ended_date
+        FROM trips
+        WHERE status = 'archived'
+        ORDER BY ended_date DESC, id DESC
+      ''')
+        return cursor.fetchall()
+
+    @invalidates('trips', 'family_details', 'expenses')
+    def delete_trip(self, trip_id):
+        """Delete a trip together with its expenses and families."""
+        cursor = self.conn.cursor()
+        try:
+            with self.transaction():
+                cursor.execute("DELETE FROM expenses WHERE trip_id = ?", (trip_id,))
+                cursor.execute("DELETE FROM family_details WHERE trip_id = ?", (trip_id,))
+                cursor.execute("DELETE FROM trips WHERE id = ?", (trip_id,))
+        except sqlite3.Error as e:
+            print(f"Error deleting trip: {e}")
+            raise
+        service = self._state.settlement_services.pop(trip_id, None)
+        if service is not None:
+            service.close()
+        self._emit(
+            TripChanged(trip_id), FamilyChanged(trip_id, None), ExpensesReset(trip_id),
+            TripSwitched(self.get_active_trip_id()))
+
+    @cached_read('trips')
     def get_active_trip_id(self):
-        self.cursor.execute('SELECT id FROM trips WHERE status = "active"')
-        active_trip = self.cursor.fetchone()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM trips WHERE status = 'active'")
+        active_trip = cursor.fetchone()
         if active_trip:
             return active_trip[0]
         else:
             return None
 
-    def create_expenses_table(self):
-        self.cursor.execute('''    
-            CREATE TABLE IF NOT EXISTS expenses (    
-            id INTEGER PRIMARY KEY,    
-            trip_id INTEGER,    
-            name TEXT,    
-            amount REAL,    
-            date DATE,    
-            trip_type TEXT,   
-            payer_id INTEGER  
-            );    
-        ''')
-        self.conn.commit()
-
-    def create_family_details_table(self):
-        self.cursor.execute('''   
-       CREATE TABLE IF NOT EXISTS family_details (   
-         id INTEGER PRIMARY KEY,   
-         family_name TEXT,   
-         num_members INTEGER,  
-         trip_id INTEGER  
-       );   
-      ''')
-        self.conn.commit()
-
+    @invalidates('expenses')
     def add_expense(self, name, amount, date, payer_id):
-        self.cursor.execute('''INSERT INTO expenses (name, amount, date, payer_id)  
+        cursor = self.conn.cursor()
+        cursor.execute('''INSERT INTO expenses (name, amount, date, payer_id)  
                      VALUES (?, ?, ?, ?)''', (name, amount, date, payer_id))
-        self.conn.commit()
+        self._commit()
+        self._emit(ExpenseAdded(cursor.lastrowid, None, payer_id, amount))
         return True
 
+    @cached_read('expenses')
     def get_total_expenses(self, trip_id):
-        self.cursor.execute('SELECT SUM(amount) FROM expenses WHERE trip_id = ?', (trip_id,))
-        total_expenses = self.cursor.fetchone()[0]
-        return total_expenses
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT total_expenses, expense_count FROM trip_totals WHERE trip_id = ?', (trip_id,))
+        totals = cursor.fetchone()
+        # None when there are no expenses, as SUM() would return
+        return totals[0] if totals and totals[1] else None
 
+    @cached_read('family_details', 'trips')
     def get_families(self, trip_id):
-        self.cursor.execute("""  
+        cursor = self.conn.cursor()
+        cursor.execute("""  
         SELECT fd.family_name, fd.num_members  
         FROM family_details fd  
         INNER JOIN trips t ON fd.family_name = t.family_name  
         WHERE t.id = ?  
       """, (trip_id,))
-        return self.cursor.fetchall()
+        return cursor.fetchall()
 
+    @invalidates('archived_trips')
     def delete_archive(self, archive_path):
+        cursor = self.conn.cursor()
         if os.path.exists(archive_path):
             os.remove(archive_path)
-        self.cursor.execute("DELETE FROM archived_trips WHERE archive_path = ?", (archive_path,))
-        self.conn.commit()
+        cursor.execute("DELETE FROM archived_trips WHERE archive_path = ?", (archive_path,))
+        self._commit()
 
+    @cached_read('family_details')
     def get_all_family_names(self, trip_id):
-        self.cursor.execute('SELECT family_name FROM family_details')
-        all_family_names = [row[0] for row in self.cursor.fetchall()]
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT family_name FROM family_details WHERE trip_id = ? ORDER BY id', (trip_id,))
+        all_family_names = [row[0] for row in cursor.fetchall()]
         return all_family_names
 
+    @cached_read('family_details')
     def get_family_count(self, trip_id):
-        self.cursor.execute('SELECT COUNT(*) FROM family_details WHERE trip_id = ?', (trip_id,))
-        count = self.cursor.fetchone()[0]
-        return count
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT family_count FROM trip_totals WHERE trip_id = ?', (trip_id,))
+        totals = cursor.fetchone()
+        return totals[0] if totals else 0
 
+    @cached_read('expenses', 'family_details')
     def get_expenses_by_family(self, trip_id):
-        self.cursor.execute('''   
-       SELECT family_details.family_name, SUM(expenses.amount) AS total_amount   
-       FROM expenses   
-       JOIN family_details ON expenses.payer_id = family_details.id   
-       WHERE expenses.trip_id = ?   
-       GROUP BY family_details.family_name   
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT fd.family_name, SUM(fb.paid) AS total_amount
+        FROM family_details fd
+        JOIN family_balances fb ON fb.family_id = fd.id
+        WHERE fd.trip_id = ? AND fb.expense_count > 0
+        GROUP BY fd.family_name
       ''', (trip_id,))
-        expenses_by_family = self.cursor.fetchall()
+        expenses_by_family = cursor.fetchall()
         return expenses_by_family
 
+    @cached_read('family_details')
     def get_family_names(self):
-        self.cursor.execute("SELECT DISTINCT family_name FROM family_details")
-        family_names = [row[0] for row in self.cursor.fetchall()]
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT DISTINCT family_name FROM family_details")
+        family_names = [row[0] for row in cursor.fetchall()]
         return family_names
 
-    def check_family_name(self, family_name):
-        self.cursor.execute('SELECT * FROM family_details WHERE family_name = ?', (family_name,))
-        if self.cursor.fetchone():
+    @cached_read('family_details', 'trips')
+    def check_family_name(self, family_name, trip_id=None):
+        cursor = self.conn.cursor()
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        cursor.execute('SELECT * FROM family_details WHERE family_name = ? AND trip_id = ?',
+                            (family_name, trip_id))
+        if cursor.fetchone():
             return True
         else:
             return False
 
     def get_expenses(self, trip_id):
-        self.cursor.execute("""  
+        cursor = self.conn.cursor()
+        cursor.execute("""  
         SELECT id, name, amount, date, payer_id  
         FROM expenses  
         WHERE trip_id = ?  
       """, (trip_id,))
-        return self.cursor.fetchall()
+        return cursor.fetchall()
 
     def get_per_head_cost(self, trip_id):
         total_expenses = self.get_total_expenses(trip_id)
@@ -404,125 +659,255 @@ class ExpenseTracker:
         per_head_cost = total_expenses / total_members
         return per_head_cost
 
-    def settle_expenses(self, trip_id):
-        all_family_names = self.get_all_family_names(trip_id)
-        expenses_by_family = self.get_expenses_by_family(trip_id)
-        per_head_cost = self.get_per_head_cost(trip_id)
-        settlement = []
-        for family_name in all_family_names:
-            total_amount = 0
-            for expense_family_name, expense_amount in expenses_by_family:
-                if expense_family_name == family_name:
-                    total_amount = expense_amount
-                    break
-            family_members = self.get_family_members(family_name)
-            amount_to_pay = total_amount - per_head_cost * family_members
-            settlement.append((family_name, amount_to_pay))
-        payers = [(family_name, amount) for family_name, amount in settlement if amount < 0]
-        receivers = [(family_name, amount) for family_name, amount in settlement if amount > 0]
-        transactions = []
-        while payers and receivers:
-            payer_name, payer_amount = payers.pop(0)
-            receiver_name, receiver_amount = receivers.pop(0)
-            settlement_amount = min(abs(payer_amount), receiver_amount)
-            transactions.append((payer_name, receiver_name, settlement_amount))
-            payer_amount += settlement_amount
-            receiver_amount -= settlement_amount
-            if payer_amount < 0:
-                payers.insert(0, (payer_name, payer_amount))
-            if receiver_amount > 0:
-                receivers.insert(0, (receiver_name, receiver_amount))
-        return transactions
-
+    def diff_balance_tables(self, tolerance=1e-6):
+        """Compare family_balances and trip_totals with a fresh aggregation.
+
+        Returns a list of (table, key, stored_row, expected_row) for every
+        row that is missing, extra or off by more than ``tolerance``.
+        """
+        checks = [
+            ('family_balances', 'SELECT family_id, paid, expense_count FROM family_balances', FAMILY_BALANCES_QUERY),
+            ('trip_totals',
+             'SELECT trip_id, total_expenses, expense_count, total_members, family_count FROM trip_totals',
+             TRIP_TOTALS_QUERY),
+        ]
+        differences = []
+        for table, stored_query, expected_query in checks:
+            stored = {row[0]: row for row in self.conn.execute(stored_query)}
+            expected = {row[0]: row for row in self.conn.execute(expected_query)}
+            for key in stored.keys() | expected.keys():
+                stored_row, expected_row = stored.get(key), expected.get(key)
+                if (stored_row is None or expected_row is None
+                        or any(abs(a - b) > tolerance for a, b in zip(stored_row[1:], expected_row[1:]))):
+                    differences.append((table, key, stored_row, expected_row))
+        return differences
+
+    @invalidates('expenses', 'family_details')
+    def rebuild_balance_tables(self):
+        """Recompute family_balances and trip_totals from scratch.
+
+        Returns the differences found before the rebuild.
+        """
+        cursor = self.conn.cursor()
+        differences = self.diff_balance_tables()
+        with self.transaction():
+            cursor.execute('DELETE FROM family_balances')
+            cursor.execute('INSERT INTO family_balances (family_id, paid, expense_count)' + FAMILY_BALANCES_QUERY)
+            cursor.execute('DELETE FROM trip_totals')
+            cursor.execute(
+                'INSERT INTO trip_totals (trip_id, total_expenses, expense_count, total_members, family_count)'
+                + TRIP_TOTALS_QUERY)
+        self._emit(ExpensesReset(None), FamilyChanged(None, None))
+        if differences:
+            print(f"Rebuilt balance tables, {len(differences)} rows were out of date")
+        return differences
+
+    def get_settlement_service(self, trip_id=None):
+        """Return the SettlementService keeping a trip's settlements current."""
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        if trip_id not in self._state.settlement_services:
+            self._state.settlement_services[trip_id] = SettlementService(self, trip_id)
+        return self._state.settlement_services[trip_id]
+
+    def settle_expenses(self, trip_id, strategy=DEFAULT_STRATEGY):
+        return self.get_settlement_service(trip_id).settlements(strategy)
+
+    def data_version(self):
+        """Return a value that changes whenever the data may have changed.
+
+        PRAGMA data_version moves when another connection commits;
+        total_changes counts the rows written through this one.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA data_version")
+        return cursor.fetchone()[0], self.conn.total_changes
+
+    def get_trip_snapshot(self, trip_id=None, strategy=DEFAULT_STRATEGY):
+        """Return a TripSnapshot of a trip (the active one by default).
+
+        Snapshots are computed once per data version and strategy, so every
+        screen asking for the same trip shares one read of its data.
+        Returns None if there is no such trip.
+        """
+        version = self.data_version()
+        if version != self._state.snapshot_version:
+            self._state.snapshots = {}
+            self._state.snapshot_version = version
+
+        key = (trip_id, strategy)
+        if key not in self._state.snapshots:
+            trip = self.get_active_trip() if trip_id is None else self.get_trip(trip_id)
+
+            snapshot = None
+            if trip:
+                families = self.get_family_details(trip.id)
+                expenses = self.get_expenses_with_payer_name(trip.id)
+                service = self.get_settlement_service(trip.id)
+                snapshot = TripSnapshot(
+                    trip, families, expenses, strategy,
+                    balances=service.balances(), settlements=service.settlements(strategy))
+            self._state.snapshots[key] = snapshot
+        return self._state.snapshots[key]
+
+    @cached_read('family_details', 'trips')
     def get_total_members(self, trip_id=None):
-        self.cursor.execute('SELECT SUM(num_members) FROM family_details')
-        total_members = self.cursor.fetchone()[0]
-        return total_members
-
-    def get_family_members(self, family_name):
-        self.cursor.execute('SELECT num_members FROM family_details WHERE family_name = ?', (family_name,))
-        num_members = self.cursor.fetchone()
+        cursor = self.conn.cursor()
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        cursor.execute('SELECT total_members, family_count FROM trip_totals WHERE trip_id = ?', (trip_id,))
+        totals = cursor.fetchone()
+        # None when there are no families, as SUM() would return
+        return totals[0] if totals and totals[1] else None
+
+    @cached_read('family_details', 'trips')
+    def get_family_members(self, family_name, trip_id=None):
+        cursor = self.conn.cursor()
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        cursor.execute('SELECT num_members FROM family_details WHERE family_name = ? AND trip_id = ?',
+                            (family_name, trip_id))
+        num_members = cursor.fetchone()
         return num_members[0] if num_members else 0
 
-    def get_family_by_name(self, family_name):
-        self.cursor.execute("SELECT id FROM family_details WHERE family_name = ?", (family_name,))
-        return self.cursor.fetchone()
+    @cached_read('family_details', 'trips')
+    def get_family_by_name(self, family_name, trip_id=None):
+        cursor = self.conn.cursor()
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        cursor.execute("SELECT id FROM family_details WHERE family_name = ? AND trip_id = ?",
+                            (family_name, trip_id))
+        return cursor.fetchone()
 
+    @invalidates('expenses')
     def save_expense(self, trip_id, name, amount, date, payer_id):
+        """Save an expense and return its id, or False if it could not be saved."""
+        cursor = self.conn.cursor()
         try:
-            self.conn.execute('BEGIN TRANSACTION')
-            self.cursor.execute('''
-                INSERT INTO expenses (trip_id, name, amount, date, payer_id)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (trip_id, name, amount, date, payer_id))
-            self.conn.commit()
-            return True
+            with self.transaction():
+                cursor.execute('''
+                    INSERT INTO expenses (trip_id, name, amount, date, payer_id)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (trip_id, name, amount, date, payer_id))
+            expense_id = cursor.lastrowid
+            self._emit(ExpenseAdded(expense_id, trip_id, payer_id, amount))
+            return expense_id
         except sqlite3.Error as e:
-            self.conn.rollback()
             print(f"Error saving expense: {e}")
+            if self._state.transaction_depth:
+                raise  # Let the enclosing transaction decide what to roll back
             return False
 
+    @invalidates('expenses')
+    def import_expenses(self, expenses, chunk_size=IMPORT_CHUNK_SIZE):
+        """Insert many expenses at once.
+
+        ``expenses`` is any iterable of (trip_id, name, amount, date, payer_id)
+        tuples. Rows are inserted with executemany, one transaction per
+        chunk, so the iterable is never held in memory as a whole. Returns
+        the number of rows inserted.
+        """
+        cursor = self.conn.cursor()
+        expenses = iter(expenses)
+        imported = 0
+        while True:
+            chunk = list(islice(expenses, chunk_size))
+            if not chunk:
+                return imported
+            with self.transaction():
+                cursor.executemany('''
+                    INSERT INTO expenses (trip_id, name, amount, date, payer_id)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', chunk)
+            imported += len(chunk)
+            trip_ids = dict.fromkeys(row[0] for row in chunk)
+            self._emit(*[ExpensesReset(trip_id) for trip_id in trip_ids])
+
     def expense(self, trip_id):
-        self.cursor.execute('''   
+        cursor = self.conn.cursor()
+        cursor.execute('''   
         SELECT expenses.id, expenses.trip_id, expenses.name, expenses.amount, expenses.date, family_details.family_name   
         FROM expenses   
         JOIN family_details ON expenses.payer_id = family_details.id   
         WHERE expenses.trip_id = ?  
       ''', (trip_id,))
-        return self.cursor.fetchall()
+        return cursor.fetchall()
 
     def check_database_integrity(self):
+        cursor = self.conn.cursor()
         try:
-            self.cursor.execute("PRAGMA integrity_check")
-            result = self.cursor.fetchone()
+            cursor.execute("PRAGMA integrity_check")
+            result = cursor.fetchone()
             return result[0] == "ok"
         except sqlite3.Error as e:
             print(f"Database integrity check failed: {e}")
             return False
 
+    @invalidates('trips')
     def save_trip(self, trip_name, trip_start_date, trip_type, family_name, individual_name, num_family_members):
+        cursor = self.conn.cursor()
         try:
             if family_name is None:
-                self.cursor.execute(
+                cursor.execute(
                     'INSERT INTO trips (name, start_date, trip_type, individual_name, num_family_members, status) VALUES (?, ?, ?, ?, ?, "active")',
                     (trip_name, trip_start_date, trip_type, individual_name, num_family_members))
             else:
-                self.cursor.execute(
+                cursor.execute(
                     'INSERT INTO trips (name, start_date, trip_type, family_name, individual_name, num_family_members, status) VALUES (?, ?, ?, ?, ?, ?, "active")',
                     (trip_name, trip_start_date, trip_type, family_name, individual_name, num_family_members))
-            self.conn.commit()
+            self._commit()
+            self._emit(TripSwitched(cursor.lastrowid))
             return True
         except sqlite3.Error as e:
             print(f"Error saving trip: {e}")
+            if self._state.transaction_depth:
+                raise  # Let the enclosing transaction decide what to roll back
             return False
 
+    @invalidates('family_details')
     def delete_family_record(self, family_id):
-        self.cursor.execute("DELETE FROM family_details WHERE id=?", (family_id,))
-        self.conn.commit()
-
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT trip_id FROM family_details WHERE id = ?", (family_id,))
+        family = cursor.fetchone()
+        cursor.execute("DELETE FROM family_details WHERE id=?", (family_id,))
+        self._commit()
+        if family:
+            self._emit(FamilyChanged(family[0], family_id))
+
+    @invalidates('expenses')
     def delete_expense(self, expense_id):
-        self.cursor.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
-        self.conn.commit()
-        if self.cursor.rowcount == 0:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT trip_id, payer_id, amount FROM expenses WHERE id = ?", (expense_id,))
+        expense = cursor.fetchone()
+        cursor.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+        self._commit()
+        if cursor.rowcount == 0:
             return False
         else:
+            trip_id, payer_id, amount = expense
+            self._emit(ExpenseDeleted(expense_id, trip_id, payer_id, amount))
             return True
 
+    @cached_read('trips')
     def get_trips(self):
-        self.cursor.execute('SELECT * FROM trips')
-        return self.cursor.fetchall()
+        return list(self.iter_trips())
+
+    def iter_trips(self, chunk_size=ITER_CHUNK_SIZE):
+        return self._iter_rows(f'SELECT {select_list(Trip)} FROM trips ORDER BY id', (), chunk_size, Trip)
 
     def get_expenses(self):
-        self.cursor.execute("SELECT * FROM expenses")
-        return self.cursor.fetchall()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM expenses")
+        return cursor.fetchall()
 
     def get_trip_details(self, trip_id):
-        self.cursor.execute('''  
+        cursor = self.conn.cursor()
+        cursor.execute('''  
         SELECT name, start_date, trip_type  
         FROM trips  
         WHERE id = ?  
       ''', (trip_id,))
-        result = self.cursor.fetchone()
+        result = cursor.fetchone()
         if result:
             return {
                 'name': result[0],
@@ -531,50 +916,145 @@ class ExpenseTracker:
             }
         return None
 
-    def get_family_id(self, family_name):
-        self.cursor.execute("SELECT id FROM family_details WHERE family_name = ?", (family_name,))
-        result = self.cursor.fetchone()
+    @cached_read('family_details', 'trips')
+    def get_family_id(self, family_name, trip_id=None):
+        cursor = self.conn.cursor()
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        cursor.execute("SELECT id FROM family_details WHERE family_name = ? AND trip_id = ?",
+                            (family_name, trip_id))
+        result = cursor.fetchone()
         if result:
             return result[0]
         else:
             return None
 
+    @cached_read('expenses', 'family_details')
     def get_expenses_with_payer_name(self, trip_id):
-        query = '''  
-        SELECT expenses.id, expenses.trip_id, expenses.name, expenses.amount, expenses.date,  
-             expenses.payer_id,  
-             COALESCE(family_details.family_name, 'Unknown') AS payer_name  
-        FROM expenses  
-        LEFT JOIN family_details ON expenses.payer_id = family_details.id  
-        WHERE expenses.trip_id = ?  
+        return list(self.iter_expenses_with_payer_name(trip_id))
+
+    def iter_expenses_with_payer_name(self, trip_id, chunk_size=ITER_CHUNK_SIZE):
+        return self.iter_expenses(trip_id, chunk_size)
+
+    @cached_read('expenses', 'family_details')
+    def get_expenses_page(self, trip_id, after=None, limit=EXPENSE_PAGE_LIMIT):
+        """Return up to ``limit`` expenses of a trip in (date, id) order.
+
+        ``after`` is the (date, id) key of the last row of the previous page,
+        or None for the first page. Each page is a seek on the
+        (trip_id, date, id) index, so it costs the same anywhere in the trip.
+        Rows are Expense records.
+        """
+        cursor = self.conn.cursor()
+        query = EXPENSE_QUERY + '''
+        WHERE expenses.trip_id = ? {after}
+        ORDER BY expenses.date, expenses.id
+        LIMIT ?
       '''
-        self.cursor.execute(query, (trip_id,))
-        return self.cursor.fetchall()
-
+        if after is None:
+            cursor.execute(query.format(after=''), (trip_id, limit))
+        elif after[0] is None:
+            # Rows without a date sort first
+            cursor.execute(
+                query.format(after='AND (expenses.date IS NOT NULL OR expenses.id > ?)'),
+                (trip_id, after[1], limit))
+        else:
+            cursor.execute(
+                query.format(after='AND (expenses.date, expenses.id) > (?, ?)'),
+                (trip_id, after[0], after[1], limit))
+        return [Expense._make(row) for row in cursor.fetchall()]
+
+    @cached_read('expenses')
+    def get_expense_key_at(self, trip_id, position):
+        """Return the (date, id) key of the expense at ``position`` in page order, or None.
+
+        Reads only the (trip_id, date, id) index; used to start paging
+        part-way through a trip.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT date, id FROM expenses
+        WHERE trip_id = ?
+        ORDER BY date, id
+        LIMIT 1 OFFSET ?
+      ''', (trip_id, position))
+        return cursor.fetchone()
+
+    @cached_read('expenses', 'family_details')
+    def get_expense(self, expense_id):
+        """Return one expense as an Expense record, or None."""
+        cursor = self.conn.cursor()
+        cursor.execute(EXPENSE_QUERY + 'WHERE expenses.id = ?', (expense_id,))
+        expense = cursor.fetchone()
+        return Expense._make(expense) if expense else None
+
+    @cached_read('expenses')
+    def get_expense_position(self, trip_id, key):
+        """Return how many of a trip's expenses come before the (date, id) ``key`` in page order.
+
+        Counts entries of the (trip_id, date, id) index only.
+        """
+        cursor = self.conn.cursor()
+        date, expense_id = key
+        if date is None:
+            # Rows without a date sort first
+            cursor.execute(
+                'SELECT COUNT(*) FROM expenses WHERE trip_id = ? AND date IS NULL AND id < ?',
+                (trip_id, expense_id))
+        else:
+            cursor.execute(
+                'SELECT COUNT(*) FROM expenses WHERE trip_id = ? AND (date IS NULL OR (date, id) < (?, ?))',
+                (trip_id, date, expense_id))
+        return cursor.fetchone()[0]
+
+    @cached_read('expenses')
+    def get_expense_count(self, trip_id):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT expense_count FROM trip_totals WHERE trip_id = ?', (trip_id,))
+        totals = cursor.fetchone()
+        return totals[0] if totals else 0
+
+    @invalidates('trips')
     def update_trip_family_details(self, family_name, num_members):
-        self.cursor.execute(
+        cursor = self.conn.cursor()
+        cursor.execute(
             'UPDATE trips SET family_name = COALESCE(family_name, ?), num_family_members = COALESCE(num_family_members, ?) WHERE status = "active"',
             (family_name, num_members))
-        self.conn.commit()
+        self._commit()
+        self._emit(TripChanged(self.get_active_trip_id()))
 
+    @cached_read('expenses', 'family_details')
     def get_expenses(self, trip_id):
-        self.cursor.execute('SELECT * FROM expenses WHERE trip_id = ?', (trip_id,))
-        return self.cursor.fetchall()
+        return list(self.iter_expenses(trip_id))
+
+    def iter_expenses(self, trip_id, chunk_size=ITER_CHUNK_SIZE):
+        """Yield a trip's expenses, with payer names, as Expense records in id order."""
+        return self._iter_rows(
+            EXPENSE_QUERY + 'WHERE expenses.trip_id = ? ORDER BY expenses.id', (trip_id,), chunk_size, Expense)
 
+    @invalidates('expenses')
     def clear_expenses(self):
-        self.cursor.execute("DELETE FROM expenses")
-        self.conn.commit()
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM expenses")
+        self._commit()
+        self._emit(ExpensesReset(None))
 
+    @invalidates('trips')
     def clear_trips(self):
-        self.cursor.execute('DELETE FROM trips WHERE status = "active"')
-        self.conn.commit()
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM trips WHERE status = "active"')
+        self._commit()
+        self._emit(TripSwitched(None))
 
+    @invalidates('family_details')
     def save_family_details(self, family_name, num_members, trip_id):
-        self.cursor.execute(
+        cursor = self.conn.cursor()
+        cursor.execute(
             'INSERT INTO family_details (family_name, num_members, trip_id) VALUES (?, ?, ?)',
             (family_name, num_members, trip_id)
         )
-        self.conn.commit()
+        self._commit()
+        self._emit(FamilyChanged(trip_id, cursor.lastrowid))
 
     def get_settlements(self):
         # Retrieve settlement data from the database
@@ -582,20 +1062,33 @@ class ExpenseTracker:
         # ... database query to retrieve settlement data ...
         return settlements
 
-    def get_family_details(self):
-        self.cursor.execute('SELECT * FROM family_details')
-        self.conn.commit()
-        return self.cursor.fetchall()
+    @cached_read('family_details', 'trips')
+    def get_family_details(self, trip_id=None):
+        return list(self.iter_family_details(trip_id))
+
+    def iter_family_details(self, trip_id=None, chunk_size=ITER_CHUNK_SIZE):
+        if trip_id is None:
+            trip_id = self.get_active_trip_id()
+        return self._iter_rows(
+            f'SELECT {select_list(Family)} FROM family_details WHERE trip_id = ? ORDER BY id',
+            (trip_id,), chunk_size, Family)
+    @cached_read('family_details')
     def get_family_details_active(self, trip_id):
         """Fetch family details for the given trip ID."""
-        self.cursor.execute('SELECT * FROM family_details WHERE trip_id = ?', (trip_id,))
-        self.conn.commit()
-        return self.cursor.fetchall()
+        return self.get_family_details(trip_id)
+    @invalidates('family_details')
     def clear_family_details(self):
-        self.cursor.execute('DELETE FROM family_details')
-        self.conn.commit()
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM family_details')
+        self._commit()
+        self._emit(FamilyChanged(None, None))
 
+    @invalidates('family_details')
     def update_family_record(self, family_id, new_family_name, new_num_members):
-        self.cursor.execute("UPDATE family_details SET family_name = ?, num_members = ? WHERE id = ?",
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE family_details SET family_name = ?, num_members = ? WHERE id = ?",
                             (new_family_name, new_num_members, family_id))
-        self.conn.commit()
+        self._commit()
+        cursor.execute("SELECT trip_id FROM family_details WHERE id = ?", (family_id,))
+        family = cursor.fetchone()
+        self._emit(FamilyChanged(family[0] if family else None, family_id))
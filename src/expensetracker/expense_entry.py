@@ -2,10 +2,13 @@ import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 from .database import ExpenseTracker
+from .observable import ExpenseAdded, ExpenseDeleted, ExpensesReset, FamilyChanged, Observer, TripSwitched
+from .sources import ExpensePageSource
+from .validation import validate_expense
 from datetime import datetime
 
 
-class ExpenseEntryScreen:
+class ExpenseEntryScreen(Observer):
     def __init__(self, name, app, main_screen_layout):
         try:
             print("Initializing ExpenseEntryScreen...")
@@ -53,21 +56,8 @@ class ExpenseEntryScreen:
 
             # Payer Name dropdown
             form_container.add(toga.Label('Payer Name:', style=Pack(padding=(2, 0))))
-            try:
-                # Get family names from database
-                family_details = self.database.get_family_details()
-                self.family_names = [family[1] for family in family_details]
-            except Exception as e:
-                print(f"Error fetching family details: {e}")
-                self.family_names = []
-
-            # Use Selection widget for dropdown
-            self.payer_name_input = toga.Selection(
-                items=self.family_names if self.family_names else ['No families available'],
-                style=Pack(padding=(0, 5), width=180)
-            )
-            if self.family_names:
-                self.payer_name_input.value = self.family_names[0]
+            self.payer_name_input = toga.Selection(style=Pack(padding=(0, 5), width=180))
+            self.update_payer_names()
             form_container.add(self.payer_name_input)
 
             self.scrollable_content.add(form_container)
@@ -101,18 +91,34 @@ class ExpenseEntryScreen:
             self.expense_list_container = toga.Box(style=Pack(direction=COLUMN, padding=5))
             self.scrollable_content.add(self.expense_list_container)
 
+            # Expense table; rows are read from the database as they are shown
+            self.expense_source = None
+            self.expense_table = toga.Table(
+                headings=['Date', 'Expense Item', 'Payer', 'Amount'],
+                accessors=['date', 'name', 'payer', 'amount_text'],
+                style=Pack(padding=5, height=300)
+            )
+            self.delete_expense_button = toga.Button(
+                'Delete Selected',
+                on_press=self.delete_selected_expense,
+                style=Pack(padding=2, width=150)
+            )
+
             # Set the scrollable content
             self.scroll_container.content = self.scrollable_content
 
             # Load existing expenses
             self.update_expense_list()
+
+            # Keep the table in step with expense writes, wherever they come from
+            self.database.events.add_observer(self)
             print("ExpenseEntryScreen initialized successfully")
 
         except Exception as e:
             print(f"Error initializing ExpenseEntryScreen: {e}")
             raise
 
-    def save_expense(self, sender):
+    async def save_expense(self, sender):
         try:
             # Clear previous messages
             self.message_container.clear()
@@ -123,25 +129,10 @@ class ExpenseEntryScreen:
             expense_date = self.expense_date_input.value.strip()
             payer_name = self.payer_name_input.value
 
-            if not all([expense_name, expense_amount, expense_date, payer_name]):
-                self.show_error("Please fill in all fields")
-                return
-
-            # Validate amount
             try:
-                float_amount = float(expense_amount)
-                if float_amount <= 0:
-                    self.show_error("Amount must be greater than zero")
-                    return
-            except ValueError:
-                self.show_error("Amount must be a valid number")
-                return
-
-            # Validate date format
-            try:
-                datetime.strptime(expense_date, '%Y-%m-%d')
-            except ValueError:
-                self.show_error("Date must be in YYYY-MM-DD format")
+                float_amount = validate_expense(expense_name, expense_amount, expense_date, payer_name)
+            except ValueError as e:
+                self.show_error(str(e))
                 return
 
             # Save expense using the database instance
@@ -150,13 +141,22 @@ class ExpenseEntryScreen:
                 self.show_error("No active trip found")
                 return
 
-            trip_id = active_trip[0]
-            self.database.save_expense(trip_id, expense_name, float_amount, expense_date, 1)
+            trip_id = active_trip.id
+            payer_id = self.database.get_family_id(payer_name, trip_id)
+            if payer_id is None:
+                self.show_error("Please add a family to this trip first")
+                return
+            expense_id = await self.app.write_queue.write(
+                'save_expense', trip_id, expense_name, float_amount, expense_date, payer_id
+            )
+            if not expense_id:
+                self.show_error("Error saving expense")
+                return
 
-            # Clear inputs and show success message
+            # Clear inputs and show success message; the new row arrives
+            # as an ExpenseAdded event once the write is committed
             self.clear_inputs()
             self.show_success("Expense saved successfully!")
-            self.update_expense_list()
 
         except Exception as e:
             print(f"Error saving expense: {e}")
@@ -170,14 +170,52 @@ class ExpenseEntryScreen:
         if self.family_names:
             self.payer_name_input.value = self.family_names[0]
 
+    def update_payer_names(self):
+        """Fill the payer dropdown with the families of the active trip"""
+        try:
+            # Get family names from database
+            family_details = self.database.get_family_details()
+            self.family_names = [family.family_name for family in family_details]
+        except Exception as e:
+            print(f"Error fetching family details: {e}")
+            self.family_names = []
+
+        self.payer_name_input.items = self.family_names if self.family_names else ['No families available']
+        if self.family_names:
+            self.payer_name_input.value = self.family_names[0]
+
+    def refresh(self):
+        """Reload payers and expenses after the data has changed"""
+        self.update_payer_names()
+        self.update_expense_list()
+
+    def update(self, events=()):
+        """Apply committed changes to the payers and the expense table"""
+        trip_id = self.expense_source.trip_id if self.expense_source is not None else None
+        if any(isinstance(event, TripSwitched) or
+               isinstance(event, FamilyChanged) and event.trip_id in (None, trip_id)
+               for event in events):
+            self.update_payer_names()
+        if any(isinstance(event, TripSwitched) or
+               isinstance(event, (ExpensesReset, FamilyChanged)) and event.trip_id in (None, trip_id)
+               for event in events):
+            # The list is read again as it is now, single writes included
+            self.update_expense_list()
+            return
+        for event in events:
+            if isinstance(event, ExpenseAdded) and event.trip_id == trip_id:
+                self.add_expense_row(event.expense_id)
+            elif isinstance(event, ExpenseDeleted) and event.trip_id == trip_id:
+                self.remove_expense_row(event.expense_id)
+
     def update_expense_list(self):
         """Update the list of expenses"""
         try:
             self.expense_list_container.clear()
 
             # Get active trip
-            active_trip = self.database.get_active_trip()
-            if not active_trip:
+            trip_id = self.database.get_active_trip_id()
+            if trip_id is None:
                 no_trip_label = toga.Label(
                     'No active trip found. Please create a trip first.',
                     style=Pack(padding=10)
@@ -185,10 +223,12 @@ class ExpenseEntryScreen:
                 self.expense_list_container.add(no_trip_label)
                 return
 
-            trip_id = active_trip[0]
-            expenses = self.database.get_expenses(trip_id)
+            if self.expense_source is None or self.expense_source.trip_id != trip_id:
+                self.expense_source = ExpensePageSource(self.database, trip_id)
+            else:
+                self.expense_source.reload()
 
-            if not expenses:
+            if not len(self.expense_source):
                 # Show "No expenses" message
                 no_expenses_label = toga.Label(
                     'No expenses recorded yet.',
@@ -197,52 +237,43 @@ class ExpenseEntryScreen:
                 self.expense_list_container.add(no_expenses_label)
                 return
 
-            for expense in expenses:
-                # Create container for each expense
-                expense_box = toga.Box(
-                    style=Pack(
-                        direction=COLUMN,
-                        padding=5,
-                        background_color='#f0f0f0',
-                        width=180
-                    )
-                )
-
-                # Expense details
-                details_box = toga.Box(style=Pack(direction=COLUMN, padding=2))
-                details_box.add(toga.Label(
-                    f'Name: {expense[2]}',
-                    style=Pack(padding=(0, 2), font_size=14)
-                ))
-                details_box.add(toga.Label(
-                    f'Amount: {expense[3]}',
-                    style=Pack(padding=(0, 2), font_size=14)
-                ))
-                details_box.add(toga.Label(
-                    f'Date: {expense[4]}',
-                    style=Pack(padding=(0, 2), font_size=14)
-                ))
-                expense_box.add(details_box)
-
-                # Delete button
-                delete_button = toga.Button(
-                    'Delete',
-                    style=Pack(padding=2, width=80, height=30)
-                )
-                delete_button.on_press = lambda x, expense_id=expense[0]: self.delete_expense(expense_id)
-                expense_box.add(delete_button)
-
-                self.expense_list_container.add(expense_box)
+            # Reassigning the source makes the table re-read it
+            self.expense_table.data = self.expense_source
+            self.expense_list_container.add(self.expense_table)
+            self.expense_list_container.add(self.delete_expense_button)
 
         except Exception as e:
             print(f"Error updating expense list: {e}")
             self.show_error(f"Error updating expense list: {str(e)}")
 
-    def delete_expense(self, expense_id):
+    def add_expense_row(self, expense_id):
+        """Insert a saved expense into the table without reloading the other rows"""
+        source = self.expense_source
+        expense = self.database.get_expense(expense_id)
+        if source is None or expense is None or expense.trip_id != source.trip_id or not len(source):
+            # The table is not showing this trip's expenses yet
+            self.update_expense_list()
+            return
+        source.insert_expense(expense)
+
+    def remove_expense_row(self, expense_id):
+        """Remove a deleted expense from the table without reloading the other rows"""
+        source = self.expense_source
+        if source is None or not source.remove_expense(expense_id) or not len(source):
+            self.update_expense_list()
+
+    async def delete_selected_expense(self, sender):
+        """Delete the expense selected in the table"""
+        selected = self.expense_table.selection
+        if selected is None:
+            self.show_error("Select an expense to delete")
+            return
+        await self.delete_expense(selected.id)
+
+    async def delete_expense(self, expense_id, sender=None):
         """Delete an expense"""
         try:
-            self.database.delete_expense(expense_id)
-            self.update_expense_list()
+            await self.app.write_queue.write('delete_expense', expense_id)
             self.show_success("Expense deleted successfully!")
         except Exception as e:
             self.show_error(f"Error deleting expense: {str(e)}")
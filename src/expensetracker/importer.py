@@ -0,0 +1,175 @@
+"""
+Streaming expense import and export for CSV and NDJSON files.
+
+Files are read one row at a time and handed to
+``ExpenseTracker.import_expenses`` in chunks, so memory use does not grow
+with the file. Each row needs ``name``, ``amount``, ``date`` and ``payer``
+(the payer's family name) and is checked with the same rules as the
+expense entry form. Exports write the same columns, streaming rows from
+``ExpenseTracker.iter_expenses_with_payer_name``.
+"""
+import csv
+import json
+import os
+import sqlite3
+from itertools import islice
+
+from .database import IMPORT_CHUNK_SIZE, ITER_CHUNK_SIZE
+from .validation import validate_expense
+
+
+class ImportReport:
+    """Outcome of an import: how many rows were saved and which were rejected."""
+
+    def __init__(self):
+        self.imported = 0
+        self.errors = []  # (line_number, message)
+
+    def add_error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return f"<ImportReport imported={self.imported} errors={len(self.errors)}>"
+
+
+def read_csv_rows(path):
+    """Yield (line_number, row) for each record of a CSV file with a header row."""
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        reader = csv.DictReader(csv_file)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def read_ndjson_rows(path):
+    """Yield (line_number, row) for each line of a newline-delimited JSON file.
+
+    Lines that are not JSON objects are yielded as an error message string.
+    """
+    with open(path, encoding='utf-8') as ndjson_file:
+        for line_number, line in enumerate(ndjson_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, "Each line must be a JSON object"
+                continue
+            yield line_number, row
+
+
+def _field(row, key):
+    value = row.get(key)
+    return '' if value is None else str(value).strip()
+
+
+# Columns written by exports and expected by imports
+EXPORT_FIELDS = ['name', 'amount', 'date', 'payer']
+
+ROW_READERS = {
+    '.csv': read_csv_rows,
+    '.ndjson': read_ndjson_rows,
+    '.jsonl': read_ndjson_rows,
+}
+
+
+def import_expense_rows(database, rows, trip_id, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate (line_number, row) pairs and import the good ones into a trip.
+
+    Each chunk is committed on its own. If the database rejects a chunk,
+    its rows are reported as errors and the import goes on with the next.
+    """
+    report = ImportReport()
+    payer_ids = {}
+
+    def valid_expenses():
+        for line_number, row in rows:
+            if isinstance(row, str):
+                report.add_error(line_number, row)
+                continue
+
+            name = _field(row, 'name')
+            amount = _field(row, 'amount')
+            date = _field(row, 'date')
+            payer_name = _field(row, 'payer')
+            try:
+                float_amount = validate_expense(name, amount, date, payer_name)
+            except ValueError as e:
+                report.add_error(line_number, str(e))
+                continue
+
+            if payer_name not in payer_ids:
+                payer_ids[payer_name] = database.get_family_id(payer_name, trip_id)
+            if payer_ids[payer_name] is None:
+                report.add_error(line_number, f"Unknown payer family: {payer_name}")
+                continue
+
+            yield line_number, (trip_id, name, float_amount, date, payer_ids[payer_name])
+
+    expenses = valid_expenses()
+    while True:
+        chunk = list(islice(expenses, chunk_size))
+        if not chunk:
+            return report
+        try:
+            report.imported += database.import_expenses([expense for _, expense in chunk], chunk_size)
+        except sqlite3.Error as e:
+            print(f"Error importing rows {chunk[0][0]}-{chunk[-1][0]}: {e}")
+            for line_number, _ in chunk:
+                report.add_error(line_number, f"Could not be saved: {e}")
+
+
+def import_expense_file(database, path, trip_id=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import a .csv, .ndjson or .jsonl file of expenses into a trip.
+
+    Uses the active trip unless ``trip_id`` is given. Returns an ImportReport.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ROW_READERS:
+        raise ValueError(f"Unsupported import file type: {extension}")
+    if trip_id is None:
+        trip_id = database.get_active_trip_id()
+    if trip_id is None:
+        raise ValueError("No active trip found")
+
+    report = import_expense_rows(database, ROW_READERS[extension](path), trip_id, chunk_size)
+    print(f"Imported {report.imported} expenses from {path} ({len(report.errors)} rejected)")
+    return report
+
+
+def export_expense_file(database, path, trip_id=None, chunk_size=ITER_CHUNK_SIZE):
+    """Write a trip's expenses to a .csv, .ndjson or .jsonl file.
+
+    Uses the active trip unless ``trip_id`` is given. Rows are streamed from
+    the database, so memory use does not grow with the trip. The file can
+    be read back with import_expense_file. Returns the number of rows written.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ROW_READERS:
+        raise ValueError(f"Unsupported export file type: {extension}")
+    if trip_id is None:
+        trip_id = database.get_active_trip_id()
+    if trip_id is None:
+        raise ValueError("No active trip found")
+
+    exported = 0
+    with open(path, 'w', newline='', encoding='utf-8') as export_file:
+        if extension == '.csv':
+            writer = csv.writer(export_file)
+            writer.writerow(EXPORT_FIELDS)
+        for _, _, name, amount, date, _, payer_name in database.iter_expenses_with_payer_name(trip_id, chunk_size):
+            values = [name, amount, date, payer_name]
+            if extension == '.csv':
+                writer.writerow(values)
+            else:
+                export_file.write(json.dumps(dict(zip(EXPORT_FIELDS, values))) + '\n')
+            exported += 1
+
+    print(f"Exported {exported} expenses to {path}")
+    return exported
@@ -3,22 +3,37 @@ from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 from toga.widgets import button, label, box
 import toga
-from .expense_entry import ExpenseEntryScreen
+import importlib
 
-from .settlement_details import SettlementDetailsPage
-from .settlement import SettlementScreen
-from .trips import TripListScreen, CreateTripScreen
-from .trip_history import TripHistoryScreen
-from .reporting import  ReportingScreen
+from .observable import Observer
 
+# Screens shown in the content area, by name: (module, class, widget to show).
+# A screen's module is only imported the first time the screen is opened,
+# so the main window does not wait for every screen to load.
+SCREENS = {
+    'trip_list': ('.trips', 'TripListScreen', 'scroll_container'),
+    'expenses': ('.expense_entry', 'ExpenseEntryScreen', 'scroll_container'),
+    'settlements': ('.settlement', 'SettlementScreen', 'layout'),
+    'settlement_details': ('.settlement_details', 'SettlementDetailsPage', 'layout'),
+    'create_trip': ('.trips', 'CreateTripScreen', 'layout'),
+    'trip_history': ('.trip_history', 'TripHistoryScreen', 'layout'),
+    'reporting': ('.reporting', 'ReportingScreen', 'layout'),
+}
 
 
-class MainScreen:
+class MainScreen(Observer):
     def __init__(self, name, app):
         self.app = app
         self.name = name
         self.database = app.database
 
+        # Screens built so far, the ones whose data has changed since they
+        # were last shown, and the settlement strategy each one last rendered
+        self.screens = {}
+        self.stale_screens = set()
+        self.screen_strategies = {}
+        self.database.events.add_observer(self)
+
         # Main layout
         self.layout = toga.Box(style=Pack(direction=COLUMN))
 
@@ -103,6 +118,35 @@ class MainScreen:
     def clear_content_area(self):
         self.content_area.clear()
 
+    def show_screen(self, name):
+        """Show a screen from SCREENS in the content area.
+
+        Each screen is built the first time it is opened and kept. Showing
+        it again costs nothing unless the data it rendered has changed,
+        in which case the screen is refreshed first.
+        """
+        module_name, class_name, widget_name = SCREENS[name]
+        strategy = getattr(self.app, 'settlement_strategy', None)
+        screen = self.screens.get(name)
+        if screen is None:
+            screen_class = getattr(importlib.import_module(module_name, __package__), class_name)
+            screen = screen_class(name, self.app, self.layout)  # Pass the main screen layout
+            self.screens[name] = screen
+        elif name in self.stale_screens or self.screen_strategies.get(name) != strategy:
+            # Settlement screens also depend on the chosen strategy
+            screen.refresh()
+        self.stale_screens.discard(name)
+        self.screen_strategies[name] = strategy
+        self.clear_content_area()
+        self.content_area.add(getattr(screen, widget_name))
+        return screen
+
+    def update(self, events=()):
+        """Mark built screens as needing a refresh after committed changes"""
+        # Screens that observe the events themselves keep up on their own
+        self.stale_screens.update(
+            name for name, screen in self.screens.items() if not isinstance(screen, Observer))
+
     def show_default_page(self):
         self.clear_content_area()
         default_content = box.Box(style=Pack(direction=COLUMN, padding=20))
@@ -130,11 +174,7 @@ class MainScreen:
         """Display the Current Trip screen."""
         self.clear_content_area()
         try:
-            # Initialize the TripListScreen
-            current_trip_screen = TripListScreen('trip_list', self.app, self.layout)
-
-            # Add the scrollable content to the content area
-            self.content_area.add(current_trip_screen.scroll_container)  # Use scroll_container instead of layout
+            self.show_screen('trip_list')
         except Exception as e:
             # Handle errors and display a message
             error_box = toga.Box(style=Pack(direction=COLUMN, padding=20))
@@ -183,23 +223,11 @@ class MainScreen:
 
     def show_settlement_list(self, sender):
         """Display the Settlement List view."""
-        self.clear_content_area()
-        settlements_screen = SettlementScreen(
-            'settlements',
-            self.app,
-            self.layout  # Pass the main screen layout
-        )
-        self.content_area.add(settlements_screen.layout)
+        self.show_screen('settlements')
 
     def show_settlement_details(self, sender):
         """Display the Settlement Details view."""
-        self.clear_content_area()
-        settlement_details_screen = SettlementDetailsPage(
-            'settlement_details',
-            self.app,
-            self.layout  # Pass the main screen layout
-        )
-        self.content_area.add(settlement_details_screen.layout)
+        self.show_screen('settlement_details')
 
 
 
@@ -208,8 +236,7 @@ class MainScreen:
         """Display the Expenses tab."""
         self.clear_content_area()
         try:
-            expenses_screen = ExpenseEntryScreen('expenses', self.app, self.layout)  # Pass self.layout
-            self.content_area.add(expenses_screen.scroll_container)  # Use scroll_container for scrollable content
+            self.show_screen('expenses')
         except Exception as e:
             # Show error message if screen fails to load
             error_box = box.Box(style=Pack(direction=COLUMN, padding=20))
@@ -223,19 +250,13 @@ class MainScreen:
 
 
     def show_new_trip(self, sender):
-        self.clear_content_area()
-        new_trip_screen = CreateTripScreen('create_trip', self.app, self.layout)
-        self.content_area.add(new_trip_screen.layout)
+        self.show_screen('create_trip')
 
     def show_trip_history(self, sender):
-        self.clear_content_area()
-        trip_history_screen = TripHistoryScreen('trip_history', self.app, self.layout)
-        self.content_area.add(trip_history_screen.layout)
+        self.show_screen('trip_history')
 
     def show_reports(self, sender):
-        self.clear_content_area()
-        reports_screen = ReportingScreen('reporting', self.app, self.layout)
-        self.content_area.add(reports_screen.layout)
+        self.show_screen('reporting')
 
 
 class ExpenseTrackerApp(Application):
@@ -253,10 +274,6 @@ class ExpenseTrackerApp(Application):
         # Show the window
         self.main_window.show()
 
-        main_screen = MainScreen('main', self)
-        self.main_window.content = main_screen.layout
-        self.main_window.show()
-
 
 def main():
     return ExpenseTrackerApp('Expense Tracker', 'org.example.expense_tracker')
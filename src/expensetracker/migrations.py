@@ -0,0 +1,281 @@
+"""
+Schema bootstrap and versioned migrations for the expense tracker database.
+
+The schema version is stored in ``PRAGMA user_version``. On open,
+bootstrap_schema reads it once and returns straight away when the schema
+is current. Otherwise the base tables and every migration newer than the
+recorded version run as one script in a single transaction, which bumps
+the version so they are never applied again.
+"""
+import sqlite3
+
+# Fresh aggregations matching the columns of family_balances and trip_totals.
+# Used to fill the tables and to check the trigger-maintained values.
+FAMILY_BALANCES_QUERY = '''
+    SELECT fd.id, COALESCE(SUM(e.amount), 0), COUNT(e.id)
+    FROM family_details fd
+    LEFT JOIN expenses e ON e.payer_id = fd.id AND e.trip_id = fd.trip_id
+    GROUP BY fd.id
+'''
+
+TRIP_TOTALS_QUERY = '''
+    SELECT t.trip_id,
+           COALESCE((SELECT SUM(amount) FROM expenses WHERE trip_id = t.trip_id), 0),
+           (SELECT COUNT(*) FROM expenses WHERE trip_id = t.trip_id),
+           COALESCE((SELECT SUM(num_members) FROM family_details WHERE trip_id = t.trip_id), 0),
+           (SELECT COUNT(*) FROM family_details WHERE trip_id = t.trip_id)
+    FROM (
+        SELECT id AS trip_id FROM trips
+        UNION SELECT trip_id FROM expenses WHERE trip_id IS NOT NULL
+        UNION SELECT trip_id FROM family_details WHERE trip_id IS NOT NULL
+    ) t
+'''
+
+# The tables as the first release created them; migrations build on these.
+# IF NOT EXISTS lets the same script upgrade databases that predate
+# versioning, whose tables exist but whose user_version is still 0.
+BASE_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS trips (
+        id INTEGER PRIMARY KEY,
+        name TEXT,
+        start_date DATE,
+        trip_type TEXT,
+        family_name TEXT,
+        individual_name TEXT,
+        num_family_members INTEGER,
+        status TEXT DEFAULT 'INACTIVE'
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY,
+        trip_id INTEGER,
+        name TEXT,
+        amount REAL,
+        date DATE,
+        trip_type TEXT,
+        payer_id INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS family_details (
+        id INTEGER PRIMARY KEY,
+        family_name TEXT,
+        num_members INTEGER,
+        trip_id INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS archived_trips (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trip_name TEXT NOT NULL,
+        archive_path TEXT NOT NULL,
+        archived_date TEXT NOT NULL
+    )
+    ''',
+]
+
+MIGRATIONS = [
+    # 1: index the columns every screen filters on
+    (1, [
+        'CREATE INDEX IF NOT EXISTS idx_expenses_trip_id ON expenses (trip_id)',
+        'CREATE INDEX IF NOT EXISTS idx_family_details_trip_id ON family_details (trip_id)',
+        'CREATE INDEX IF NOT EXISTS idx_family_details_family_name ON family_details (family_name)',
+        'CREATE INDEX IF NOT EXISTS idx_trips_status ON trips (status)',
+    ]),
+    # 2: keep every trip in the main database, partitioned by trip_id
+    (2, [
+        'ALTER TABLE trips ADD COLUMN ended_date TEXT',
+        # Archive files become exports; remember which trip each one holds
+        'ALTER TABLE archived_trips ADD COLUMN trip_id INTEGER',
+        # Families used to be saved against trip 1 whatever the active trip was
+        '''
+        UPDATE family_details
+        SET trip_id = (SELECT id FROM trips WHERE status = 'active')
+        WHERE EXISTS (SELECT 1 FROM trips WHERE status = 'active')
+        ''',
+    ]),
+    # 3: per-family and per-trip totals kept current by triggers
+    (3, [
+        '''
+        CREATE TABLE family_balances (
+            family_id INTEGER PRIMARY KEY,
+            paid REAL NOT NULL DEFAULT 0,
+            expense_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE trip_totals (
+            trip_id INTEGER PRIMARY KEY,
+            total_expenses REAL NOT NULL DEFAULT 0,
+            expense_count INTEGER NOT NULL DEFAULT 0,
+            total_members INTEGER NOT NULL DEFAULT 0,
+            family_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        # A family's balance only counts expenses in its own trip. Sums are
+        # reset to exactly 0 when the last row goes, so float rounding
+        # cannot leave a stray balance behind
+        '''
+        CREATE TRIGGER expenses_totals_insert AFTER INSERT ON expenses
+        BEGIN
+            INSERT OR IGNORE INTO trip_totals (trip_id) SELECT NEW.trip_id WHERE NEW.trip_id IS NOT NULL;
+            UPDATE trip_totals
+            SET total_expenses = total_expenses + NEW.amount, expense_count = expense_count + 1
+            WHERE trip_id = NEW.trip_id;
+            UPDATE family_balances
+            SET paid = paid + NEW.amount, expense_count = expense_count + 1
+            WHERE family_id = NEW.payer_id
+            AND EXISTS (SELECT 1 FROM family_details WHERE id = NEW.payer_id AND trip_id = NEW.trip_id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER expenses_totals_delete AFTER DELETE ON expenses
+        BEGIN
+            UPDATE trip_totals
+            SET total_expenses = CASE WHEN expense_count = 1 THEN 0 ELSE total_expenses - OLD.amount END,
+                expense_count = expense_count - 1
+            WHERE trip_id = OLD.trip_id;
+            UPDATE family_balances
+            SET paid = CASE WHEN expense_count = 1 THEN 0 ELSE paid - OLD.amount END,
+                expense_count = expense_count - 1
+            WHERE family_id = OLD.payer_id
+            AND EXISTS (SELECT 1 FROM family_details WHERE id = OLD.payer_id AND trip_id = OLD.trip_id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER expenses_totals_update AFTER UPDATE OF trip_id, amount, payer_id ON expenses
+        BEGIN
+            UPDATE trip_totals
+            SET total_expenses = CASE WHEN expense_count = 1 THEN 0 ELSE total_expenses - OLD.amount END,
+                expense_count = expense_count - 1
+            WHERE trip_id = OLD.trip_id;
+            UPDATE family_balances
+            SET paid = CASE WHEN expense_count = 1 THEN 0 ELSE paid - OLD.amount END,
+                expense_count = expense_count - 1
+            WHERE family_id = OLD.payer_id
+            AND EXISTS (SELECT 1 FROM family_details WHERE id = OLD.payer_id AND trip_id = OLD.trip_id);
+            INSERT OR IGNORE INTO trip_totals (trip_id) SELECT NEW.trip_id WHERE NEW.trip_id IS NOT NULL;
+            UPDATE trip_totals
+            SET total_expenses = total_expenses + NEW.amount, expense_count = expense_count + 1
+            WHERE trip_id = NEW.trip_id;
+            UPDATE family_balances
+            SET paid = paid + NEW.amount, expense_count = expense_count + 1
+            WHERE family_id = NEW.payer_id
+            AND EXISTS (SELECT 1 FROM family_details WHERE id = NEW.payer_id AND trip_id = NEW.trip_id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER family_totals_insert AFTER INSERT ON family_details
+        BEGIN
+            INSERT OR REPLACE INTO family_balances (family_id, paid, expense_count)
+            SELECT NEW.id, COALESCE(SUM(amount), 0), COUNT(*) FROM expenses
+            WHERE payer_id = NEW.id AND trip_id = NEW.trip_id;
+            INSERT OR IGNORE INTO trip_totals (trip_id) SELECT NEW.trip_id WHERE NEW.trip_id IS NOT NULL;
+            UPDATE trip_totals
+            SET total_members = total_members + COALESCE(NEW.num_members, 0), family_count = family_count + 1
+            WHERE trip_id = NEW.trip_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER family_totals_delete AFTER DELETE ON family_details
+        BEGIN
+            DELETE FROM family_balances WHERE family_id = OLD.id;
+            UPDATE trip_totals
+            SET total_members = total_members - COALESCE(OLD.num_members, 0), family_count = family_count - 1
+            WHERE trip_id = OLD.trip_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER family_totals_update AFTER UPDATE OF trip_id, num_members ON family_details
+        BEGIN
+            INSERT OR REPLACE INTO family_balances (family_id, paid, expense_count)
+            SELECT NEW.id, COALESCE(SUM(amount), 0), COUNT(*) FROM expenses
+            WHERE payer_id = NEW.id AND trip_id = NEW.trip_id;
+            UPDATE trip_totals
+            SET total_members = total_members - COALESCE(OLD.num_members, 0), family_count = family_count - 1
+            WHERE trip_id = OLD.trip_id;
+            INSERT OR IGNORE INTO trip_totals (trip_id) SELECT NEW.trip_id WHERE NEW.trip_id IS NOT NULL;
+            UPDATE trip_totals
+            SET total_members = total_members + COALESCE(NEW.num_members, 0), family_count = family_count + 1
+            WHERE trip_id = NEW.trip_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER trip_totals_insert AFTER INSERT ON trips
+        BEGIN
+            INSERT OR IGNORE INTO trip_totals (trip_id) VALUES (NEW.id);
+        END
+        ''',
+        '''
+        CREATE TRIGGER trip_totals_delete AFTER DELETE ON trips
+        BEGIN
+            DELETE FROM trip_totals WHERE trip_id = OLD.id;
+        END
+        ''',
+        # Fill both tables from the data already there
+        'INSERT INTO family_balances (family_id, paid, expense_count)' + FAMILY_BALANCES_QUERY,
+        'INSERT INTO trip_totals (trip_id, total_expenses, expense_count, total_members, family_count)'
+        + TRIP_TOTALS_QUERY,
+    ]),
+    # 4: walk a trip's expenses in (date, id) order a page at a time
+    (4, [
+        'CREATE INDEX IF NOT EXISTS idx_expenses_trip_date_id ON expenses (trip_id, date, id)',
+    ]),
+    # 5: refuse amounts the totals triggers cannot add up. NaN is stored as
+    # NULL and inf - inf is NaN, so one such row would break its trip's
+    # totals and every later delete. SQLite cannot add a CHECK constraint
+    # to an existing table, so these triggers stand in for one
+    (5, [
+        '''
+        CREATE TRIGGER expenses_amount_insert BEFORE INSERT ON expenses
+        WHEN NEW.amount IS NULL OR abs(NEW.amount) >= 9e999
+        BEGIN
+            SELECT RAISE(ABORT, 'expense amount must be a finite number');
+        END
+        ''',
+        '''
+        CREATE TRIGGER expenses_amount_update BEFORE UPDATE OF amount ON expenses
+        WHEN NEW.amount IS NULL OR abs(NEW.amount) >= 9e999
+        BEGIN
+            SELECT RAISE(ABORT, 'expense amount must be a finite number');
+        END
+        ''',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def bootstrap_schema(conn):
+    """Bring the database's schema up to date and return its version.
+
+    A current database costs one PRAGMA read. Anything older, including a
+    new empty file, is upgraded by a single script in one transaction, so
+    a failure leaves the schema exactly as it was.
+    """
+    current_version = get_schema_version(conn)
+    if current_version >= LATEST_VERSION:
+        return current_version
+
+    statements = list(BASE_SCHEMA)
+    for version, migration in MIGRATIONS:
+        if version > current_version:
+            statements.extend(migration)
+    script = ';\n'.join(['BEGIN'] + statements + [f'PRAGMA user_version = {LATEST_VERSION}', 'COMMIT'])
+    try:
+        conn.commit()
+        conn.executescript(script)
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.rollback()
+        print(f"Error upgrading schema from version {current_version}: {e}")
+        raise
+    print(f"Upgraded schema from version {current_version} to {LATEST_VERSION}")
+    return LATEST_VERSION
@@ -1,20 +1,138 @@
+"""
+Change events for the expense tracker database.
+
+Every ExpenseTracker write emits typed events on the tracker's
+ExpenseTrackerObservable. Observers are held by weak references, so a
+screen that is thrown away stops being notified without having to
+unregister. By default an observer's events are coalesced: they are
+collected while the current event loop callback runs and delivered in one
+``update(events)`` call on the loop's next turn, so a bulk import costs
+one refresh rather than one per row. Events from writes inside a
+transaction reach coalescing observers only once the transaction commits,
+and not at all if it is rolled back.
+"""
+import asyncio
+import threading
+import weakref
+from collections import namedtuple
+
+# One expense was saved or deleted
+ExpenseAdded = namedtuple('ExpenseAdded', ['expense_id', 'trip_id', 'payer_id', 'amount'])
+ExpenseDeleted = namedtuple('ExpenseDeleted', ['expense_id', 'trip_id', 'payer_id', 'amount'])
+# A trip's expenses changed in bulk (imports, clears, rolled-back transactions);
+# trip_id is None when any trip may be affected
+ExpensesReset = namedtuple('ExpensesReset', ['trip_id'])
+# A family was added, edited or removed; None fields mean "any"
+FamilyChanged = namedtuple('FamilyChanged', ['trip_id', 'family_id'])
+# The active trip is now trip_id (None when no trip is active)
+TripSwitched = namedtuple('TripSwitched', ['trip_id'])
+# A trip was added, edited or deleted without becoming the active one
+TripChanged = namedtuple('TripChanged', ['trip_id'])
+
+
 class Observer:
-   def update(self):
-      pass
+    def update(self, events=()):
+        """Called with the events emitted since the last call, oldest first."""
+        pass
 
 
 class ExpenseTrackerObservable:
-    def __init__(self, expense_tracker):
+    def __init__(self, expense_tracker, loop=None):
         self.expense_tracker = expense_tracker
-        self.observers = []
+        # Loop that coalesced updates are delivered on; defaults to the
+        # loop running in the thread that makes the write
+        self.loop = loop
+        self.observers = []  # (weak reference, coalesce, thread that added it)
+        self._pending = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def add_observer(self, observer, coalesce=True):
+        """Notify ``observer`` of changes until it is removed or garbage collected.
 
-    def add_observer(self, observer):
+        Without ``coalesce``, ``observer.update([event])`` is called straight
+        after each write, for writes made on the thread that added the
+        observer; writes from other threads show up as a new
+        ``PRAGMA data_version`` instead.
+        """
         if isinstance(observer, Observer):
-            self.observers.append(observer)
+            entry = (weakref.ref(observer, self._discard), coalesce, threading.current_thread())
+            with self._lock:
+                self.observers = self.observers + [entry]
 
     def remove_observer(self, observer):
-        self.observers.remove(observer)
+        with self._lock:
+            self.observers = [entry for entry in self.observers if entry[0]() not in (observer, None)]
+
+    def _discard(self, ref):
+        with self._lock:
+            self.observers = [entry for entry in self.observers if entry[0] is not ref]
+
+    def notify_observers(self, *events):
+        """Report the events of a committed write; called by ExpenseTracker."""
+        self.notify_local(*events)
+        self.notify_shared(*events)
+
+    def notify_local(self, *events):
+        """Deliver events to the uncoalesced observers of the calling thread.
+
+        These observers read through the same connection as the write, so
+        ExpenseTracker tells them about writes inside a transaction straight
+        away, before they are committed.
+        """
+        thread = threading.current_thread()
+        for ref, coalesce, owner in self.observers:
+            observer = ref()
+            if observer is not None and not coalesce and owner is thread:
+                self._deliver(observer, list(events))
+
+    def notify_shared(self, *events):
+        """Queue events for coalescing observers, which may run on any thread.
+
+        ExpenseTracker holds a transaction's events back until it commits,
+        so these observers never read data that could still be rolled back.
+        """
+        if not events or not any(coalesce and ref() is not None for ref, coalesce, _ in self.observers):
+            return
+        with self._lock:
+            self._pending.extend(events)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        loop = self.loop
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        if loop is None:
+            # No loop to wait for; deliver straight away
+            self.flush()
+        else:
+            loop.call_soon_threadsafe(self.flush)
+
+    def flush(self):
+        """Deliver pending events to coalescing observers now."""
+        with self._lock:
+            events, self._pending = self._pending, []
+            self._scheduled = False
+        if not events:
+            return
+        # Repeated events, such as one reset per imported chunk, count once,
+        # at their last position so a TripSwitched sequence ends on the
+        # right trip. Events are tuples, so the type is part of the key:
+        # TripSwitched(1) and ExpensesReset(1) would otherwise compare equal
+        unique = {}
+        for event in reversed(events):
+            unique.setdefault((type(event), event), event)
+        events = list(reversed(unique.values()))
+        for ref, coalesce, _ in self.observers:
+            observer = ref()
+            if observer is not None and coalesce:
+                self._deliver(observer, events)
 
-    def notify_observers(self):
-        for observer in self.observers:
-            observer.update()
\ No newline at end of file
+    def _deliver(self, observer, events):
+        try:
+            observer.update(events)
+        except Exception as e:
+            print(f"Error in change observer: {e}")
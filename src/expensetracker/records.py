@@ -0,0 +1,28 @@
+"""
+Typed rows returned by ExpenseTracker.
+
+Records are named tuples, so they index and unpack exactly like the plain
+tuples sqlite3 returns and older code keeps working, while screens can
+read fields by name. They carry no per-instance ``__dict__``, so a record
+takes the same memory as the tuple it replaces, and they are built with
+``_make`` (``tuple.__new__``), which runs in C.
+"""
+from collections import namedtuple
+
+Trip = namedtuple('Trip', [
+    'id', 'name', 'start_date', 'trip_type', 'family_name', 'individual_name',
+    'num_family_members', 'status', 'ended_date',
+])
+
+Family = namedtuple('Family', ['id', 'family_name', 'num_members', 'trip_id'])
+
+# An expense together with the name of the family that paid it
+Expense = namedtuple('Expense', ['id', 'trip_id', 'name', 'amount', 'date', 'payer_id', 'payer_name'])
+
+Settlement = namedtuple('Settlement', ['payer', 'receiver', 'amount'])
+
+
+def select_list(record, table=None):
+    """Return the SQL column list for a record, e.g. ``trips.id, trips.name, ...``."""
+    prefix = f'{table}.' if table else ''
+    return ', '.join(prefix + field for field in record._fields)
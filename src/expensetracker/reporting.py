@@ -3,6 +3,8 @@ from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 import webbrowser
 
+from .strategy_picker import StrategyPicker
+
 
 class ReportingScreen:
     def __init__(self, name, app, main_screen_layout):
@@ -16,6 +18,7 @@ class ReportingScreen:
             if not hasattr(self.app, 'database'):
                 raise AttributeError("App instance does not have a 'database' attribute.")
             self.database = self.app.database
+            self.async_database = self.app.async_database
             print("Database instance accessed")
 
             # Main container
@@ -28,6 +31,10 @@ class ReportingScreen:
             )
             self.layout.add(header_label)
 
+            # Settlement strategy picker
+            self.strategy_picker = StrategyPicker(self.app, self.update_ui)
+            self.layout.add(self.strategy_picker.selection)
+
             # Main screen container
             self.main_screen = box.Box(style=Pack(direction=COLUMN, padding=5))
             self.layout.add(self.main_screen)
@@ -53,32 +60,45 @@ class ReportingScreen:
 
             self.layout.add(footer_buttons)
 
-            # Update the UI with current data
-            self.update_ui()
+            # Update the UI once the report data has loaded
+            self.app.loop.create_task(self.update_ui())
             print("ReportingScreen initialized successfully")
 
         except Exception as e:
             print(f"Error initializing ReportingScreen: {e}")
             self.show_error(f"Error initializing screen: {str(e)}")
 
-    def update_ui(self):
+    def refresh(self):
+        """Rebuild the report after the data or the strategy has changed."""
+        self.strategy_picker.refresh()
+        self.app.loop.create_task(self.update_ui())
+
+    async def load_report_data(self):
+        """Fetch the active trip's snapshot from the database thread."""
+        return await self.async_database.get_trip_snapshot(strategy=self.strategy_picker.strategy)
+
+    async def update_ui(self):
         """Update the UI with trip report data."""
         try:
             print("Updating UI...")
             self.main_screen.clear()
+            self.main_screen.add(label.Label(
+                'Loading report...',
+                style=Pack(padding=5, font_size=14, color='gray')
+            ))
 
-            # Get active trip using the existing database instance
-            active_trip = self.database.get_active_trip()
-            if not active_trip:
+            snapshot = await self.load_report_data()
+            self.main_screen.clear()
+            if not snapshot:
                 self.show_error("No active trip found")
                 return
 
             # Create and add sections
             sections = [
-                ("Trip Details", self.create_trip_details(active_trip)),
-                ("Family Details", self.create_family_details_table(active_trip)),
-                ("Expense Details", self.create_expenses_table(active_trip)),
-                ("Settlement Details", self.create_settlement_details_table(active_trip))
+                ("Trip Details", self.create_trip_details(snapshot.trip)),
+                ("Family Details", self.create_family_details_table(snapshot.families)),
+                ("Expense Details", self.create_expenses_table(snapshot.expenses, snapshot.total_expenses)),
+                ("Settlement Details", self.create_settlement_details_table(snapshot.settlements))
             ]
 
             for title, content in sections:
@@ -107,11 +127,11 @@ class ReportingScreen:
         layout = box.Box(style=Pack(direction=COLUMN, padding=5))
         if active_trip:
             layout.add(label.Label(
-                f'Trip Name: {active_trip[1]}',
+                f'Trip Name: {active_trip.name}',
                 style=Pack(padding=(2, 5), font_size=14)
             ))
             layout.add(label.Label(
-                f'Start Date: {active_trip[2]}',
+                f'Start Date: {active_trip.start_date}',
                 style=Pack(padding=(2, 5), font_size=14)
             ))
         else:
@@ -121,18 +141,17 @@ class ReportingScreen:
             ))
         return layout
 
-    def create_family_details_table(self, active_trip):
+    def create_family_details_table(self, family_details):
         """Create family details section."""
         layout = box.Box(style=Pack(direction=COLUMN, padding=5))
-        if active_trip:
-            family_details = self.database.get_family_details()
+        if family_details:
             for family in family_details:
                 layout.add(label.Label(
-                    f'Family: {family[1]}',
+                    f'Family: {family.family_name}',
                     style=Pack(padding=(2, 2), font_size=14)
                 ))
                 layout.add(label.Label(
-                    f'Members: {family[2]}',
+                    f'Members: {family.num_members}',
                     style=Pack(padding=(2, 2), font_size=14)
                 ))
         else:
@@ -142,19 +161,10 @@ class ReportingScreen:
             ))
         return layout
 
-    def create_expenses_table(self, active_trip):
+    def create_expenses_table(self, expenses, total_amount):
         """Create expense details section."""
         layout = box.Box(style=Pack(direction=COLUMN, padding=5))
-        if active_trip:
-            expenses = self.database.get_expenses_with_payer_name(active_trip[0])
-            if not expenses:
-                layout.add(label.Label(
-                    'No Expense Details',
-                    style=Pack(padding=(2, 5), font_size=14)
-                ))
-                return layout
-
-            total_amount = sum(expense[3] for expense in expenses)
+        if expenses:
             layout.add(label.Label(
                 f'Total Expenses: {total_amount:.2f}',
                 style=Pack(padding=(2, 5), font_size=14, font_weight='bold')
@@ -162,7 +172,7 @@ class ReportingScreen:
 
             for expense in expenses:
                 layout.add(label.Label(
-                    f'{expense[2]} - {expense[3]:.2f} (Paid by {expense[6]})',
+                    f'{expense.name} - {expense.amount:.2f} (Paid by {expense.payer_name})',
                     style=Pack(padding=(2, 2), font_size=14)
                 ))
         else:
@@ -172,21 +182,13 @@ class ReportingScreen:
             ))
         return layout
 
-    def create_settlement_details_table(self, active_trip):
+    def create_settlement_details_table(self, settlements):
         """Create settlement details section."""
         layout = box.Box(style=Pack(direction=COLUMN, padding=5))
-        if active_trip:
-            settlements = self.database.settle_expenses(active_trip[0])
-            if not settlements:
-                layout.add(label.Label(
-                    'No Settlement Details',
-                    style=Pack(padding=(2, 5), font_size=14)
-                ))
-                return layout
-
+        if settlements:
             for settlement in settlements:
                 layout.add(label.Label(
-                    f'{settlement[0]} → {settlement[1]}: {settlement[2]:.2f}',
+                    f'{settlement.payer} → {settlement.receiver}: {settlement.amount:.2f}',
                     style=Pack(padding=(2, 2), font_size=14)
                 ))
         else:
@@ -196,16 +198,16 @@ class ReportingScreen:
             ))
         return layout
 
-    def generate_report(self, sender):
+    async def generate_report(self, sender):
         """Generate and share the trip report."""
         try:
-            active_trip = self.database.get_active_trip()
-            if not active_trip:
+            snapshot = await self.load_report_data()
+            if not snapshot:
                 self.show_error("No active trip to generate a report.")
                 return
 
             # Generate report content
-            report_content = self.create_report_content(active_trip)
+            report_content = self.create_report_content(snapshot)
 
             # Share the report via WhatsApp
             whatsapp_url = f"https://wa.me/?text={report_content}"
@@ -216,26 +218,28 @@ class ReportingScreen:
             print(f"Error generating report: {e}")
             self.show_error(f"Error generating report: {str(e)}")
 
-    def create_report_content(self, active_trip):
+    def create_report_content(self, snapshot):
         """Create the report content string."""
         try:
+            active_trip = snapshot.trip
+            family_details = snapshot.families
+            expenses = snapshot.expenses
+            settlements = snapshot.settlements
             report_lines = [
                 "◆ TRIP EXPENSE REPORT ◆",
-                f"Trip Name: {active_trip[1]}",
-                f"Start Date: {active_trip[2]}",
+                f"Trip Name: {active_trip.name}",
+                f"Start Date: {active_trip.start_date}",
                 "",
                 "◆ FAMILY DETAILS ◆"
             ]
 
             # Add family details
-            family_details = self.database.get_family_details()
             if family_details:
                 for family in family_details:
-                    report_lines.append(f"{family[1]}: {family[2]} members")
+                    report_lines.append(f"{family.family_name}: {family.num_members} members")
 
             # Add expense details
-            expenses = self.database.get_expenses_with_payer_name(active_trip[0])
-            total_amount = sum(expense[3] for expense in expenses)
+            total_amount = snapshot.total_expenses or 0
             report_lines.extend([
                 "",
                 f"◆ EXPENSE DETAILS (Total: {total_amount:.2f}) ◆"
@@ -244,11 +248,10 @@ class ReportingScreen:
             if expenses:
                 for expense in expenses:
                     report_lines.append(
-                        f"{expense[4]}: {expense[2]} (Paid by {expense[6]}): {expense[3]:.2f}"
+                        f"{expense.date}: {expense.name} (Paid by {expense.payer_name}): {expense.amount:.2f}"
                     )
 
             # Add settlement details
-            settlements = self.database.settle_expenses(active_trip[0])
             report_lines.extend([
                 "",
                 "◆ SETTLEMENT DETAILS ◆"
@@ -257,7 +260,7 @@ class ReportingScreen:
             if settlements:
                 for settlement in settlements:
                     report_lines.append(
-                        f"{settlement[0]} → {settlement[1]}: {settlement[2]:.2f}"
+                        f"{settlement.payer} → {settlement.receiver}: {settlement.amount:.2f}"
                     )
 
             report_lines.extend([
@@ -1,7 +1,8 @@
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
-from toga.widgets import button, label, box
+from toga.widgets import button, label, box, table
 from .database import ExpenseTracker
+from .sources import ExpensePageSource
 
 
 class SettlementScreen:
@@ -12,6 +13,7 @@ class SettlementScreen:
             self.name = name
             self.main_screen_layout = main_screen_layout
             self.database = self.app.database  # Use the existing database instance
+            self.async_database = self.app.async_database
 
             # Main container
             self.layout = box.Box(style=Pack(direction=COLUMN, padding=10))
@@ -30,7 +32,7 @@ class SettlementScreen:
             self.layout.add(header_label)
 
             # Expense details container
-            self.expenses_container = box.Box(style=Pack(direction=COLUMN, padding=5))
+            self.expenses_container = box.Box(style=Pack(direction=COLUMN, padding=5, flex=1))
             self.layout.add(self.expenses_container)
 
             # Buttons container
@@ -54,37 +56,51 @@ class SettlementScreen:
 
             self.layout.add(button_container)
 
-            # Load expense details after UI is set up
-            self.load_expense_details()
+            # Load expense details in the background once the UI is set up
+            self.show_loading_message()
+            self.app.loop.create_task(self.load_expense_details())
             print("SettlementScreen initialized successfully")
 
         except Exception as e:
             print(f"Error initializing SettlementScreen: {e}")
             self.show_error(f"Error initializing screen: {str(e)}")
 
-    def load_expense_details(self):
+    def refresh(self):
+        """Reload the expense list after the data has changed."""
+        self.show_loading_message()
+        self.app.loop.create_task(self.load_expense_details())
+
+    async def load_expense_details(self):
         """Load and display expense details with payer names."""
         try:
             print("Loading expense details...")
-            self.expenses_container.clear()
 
             # Get the active trip
-            active_trip = self.database.get_active_trip()
-            if not active_trip:
+            trip_id = await self.async_database.get_active_trip_id()
+            if trip_id is None:
                 self.show_no_expenses_message()
                 return
 
-            trip_id = active_trip[0]
-            expenses = self.database.get_expenses_with_payer_name(trip_id)
+            expense_count = await self.async_database.get_expense_count(trip_id)
 
-            if not expenses:
+            if not expense_count:
                 self.show_no_expenses_message()
             else:
-                self.display_expenses(expenses)
+                # The table pulls rows from the source as they scroll into view
+                self.display_expenses(ExpensePageSource(self.database, trip_id))
         except Exception as e:
             print(f"Error loading expenses: {e}")
             self.show_error(f"Error loading expenses: {str(e)}")
 
+    def show_loading_message(self):
+        """Display a placeholder while expenses are loading."""
+        self.expenses_container.clear()
+        loading_label = label.Label(
+            'Loading expenses...',
+            style=Pack(padding=10, text_align='center', font_size=14, color='gray')
+        )
+        self.expenses_container.add(loading_label)
+
     def show_no_expenses_message(self):
         """Display message when no expenses are available."""
         self.expenses_container.clear()
@@ -94,31 +110,18 @@ class SettlementScreen:
         )
         self.expenses_container.add(no_expenses_label)
 
-    def display_expenses(self, expenses):
-        """Display the list of expenses with payer names."""
+    def display_expenses(self, expense_source):
+        """Display the expenses with payer names in a data-backed table."""
         print("Displaying expenses...")
         self.expenses_container.clear()
 
-        # Add table headers
-        header_box = box.Box(style=Pack(direction=ROW, padding=5))
-        header_box.add(label.Label('Sl. No.', style=Pack(flex=1, padding=5, font_weight='bold')))
-        header_box.add(label.Label('Date', style=Pack(flex=2, padding=5, font_weight='bold')))
-        header_box.add(label.Label('Expense Item', style=Pack(flex=3, padding=5, font_weight='bold')))
-        header_box.add(label.Label('Payer Family', style=Pack(flex=2, padding=5, font_weight='bold')))
-        header_box.add(label.Label('Amount', style=Pack(flex=1, padding=5, font_weight='bold')))
-        self.expenses_container.add(header_box)
-
-        # Add expense rows
-        for index, expense in enumerate(expenses, start=1):
-            expense_box = box.Box(style=Pack(direction=ROW, padding=5))
-
-            expense_box.add(label.Label(f'{index}', style=Pack(flex=1, padding=5)))
-            expense_box.add(label.Label(f'{expense[4]}', style=Pack(flex=2, padding=5)))  # Date
-            expense_box.add(label.Label(f'{expense[2]}', style=Pack(flex=3, padding=5)))  # Expense Item
-            expense_box.add(label.Label(f'{expense[6]}', style=Pack(flex=2, padding=5)))  # Payer Family
-            expense_box.add(label.Label(f'{expense[3]:.2f}', style=Pack(flex=1, padding=5)))  # Amount
-
-            self.expenses_container.add(expense_box)
+        expense_table = table.Table(
+            headings=['Sl. No.', 'Date', 'Expense Item', 'Payer Family', 'Amount'],
+            accessors=['number', 'date', 'name', 'payer', 'amount_text'],
+            data=expense_source,
+            style=Pack(flex=1, padding=5)
+        )
+        self.expenses_container.add(expense_table)
         print("Expenses displayed successfully")
 
     def goto_settlement_details(self, sender):
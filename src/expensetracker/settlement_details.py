@@ -3,6 +3,7 @@ from toga.style.pack import COLUMN
 from toga.widgets import box, button, label, table
 from .database import ExpenseTracker
 from .settlement import SettlementScreen
+from .strategy_picker import StrategyPicker
 
 
 
@@ -12,6 +13,7 @@ class SettlementDetailsPage:
         self.name = name
         self.main_screen_layout = main_screen_layout
         self.database = app.database
+        self.async_database = app.async_database
 
         # Main container
         self.layout = box.Box(style=Pack(direction=COLUMN, padding=10))
@@ -37,6 +39,10 @@ class SettlementDetailsPage:
         )
         self.layout.add(self.cost_summary_table)
 
+        # Settlement strategy picker
+        self.strategy_picker = StrategyPicker(self.app, self.update_settlements)
+        self.layout.add(self.strategy_picker.selection)
+
         # Settlement details table
         self.settlement_details_table = table.Table(
             headings=['Payer', 'Receiver', 'Amount'],
@@ -52,25 +58,30 @@ class SettlementDetailsPage:
         )
         self.layout.add(back_button)
 
-        # Update UI with data
-        self.update_ui()
+        # Update UI with data once it has loaded
+        self.app.loop.create_task(self.update_ui())
+
+    def refresh(self):
+        """Reload the settlement after the data or the strategy has changed."""
+        self.strategy_picker.refresh()
+        self.app.loop.create_task(self.update_ui())
 
-    def update_ui(self):
+    async def update_ui(self):
         """Update the UI with trip and settlement details."""
         try:
-            active_trip = self.database.get_active_trip()
+            snapshot = await self.async_database.get_trip_snapshot(strategy=self.strategy_picker.strategy)
 
-            if active_trip:
+            if snapshot:
                 # Update trip name and total expense
-                self.trip_name_label.text = f'Trip Name: {active_trip[1]}'
-                total_expenses = self.database.get_total_expenses(active_trip[0])
+                self.trip_name_label.text = f'Trip Name: {snapshot.trip.name}'
+                total_expenses = snapshot.total_expenses
                 self.total_label.text = (
                     f'Total Expense: {total_expenses:.2f}' if total_expenses else 'No Expenses Added Yet'
                 )
 
                 # Update tables
-                self.update_cost_summary_table(active_trip[0])
-                self.update_settlement_details_table(active_trip[0])
+                self.update_cost_summary_table(snapshot)
+                self.update_settlement_details_table(snapshot)
             else:
                 self.trip_name_label.text = 'No Active Trip'
                 self.total_label.text = 'No Expenses Added Yet'
@@ -79,38 +90,40 @@ class SettlementDetailsPage:
             print(f"Error updating UI: {e}")
             self.show_error(f"Error updating UI: {str(e)}")
 
-    def update_cost_summary_table(self, active_trip_id):
+    def update_cost_summary_table(self, snapshot):
         """Update the cost summary table."""
         try:
             self.cost_summary_table.data = []
-            families = self.database.get_family_count(active_trip_id)
-            total_members = self.database.get_total_members(active_trip_id)
-            total_expenses = self.database.get_total_expenses(active_trip_id)
 
-            if total_expenses is None or total_members is None or total_members == 0:
+            if snapshot.per_head_cost is None:
                 per_head_cost = 'N/A'
             else:
-                per_head_cost = f'{total_expenses / total_members:.2f}'
+                per_head_cost = f'{snapshot.per_head_cost:.2f}'
 
-            self.cost_summary_table.data.append([families, total_members, per_head_cost])
+            self.cost_summary_table.data.append([snapshot.family_count, snapshot.total_members, per_head_cost])
 
         except Exception as e:
             print(f"Error updating cost summary table: {e}")
             self.show_error(f"Error updating cost summary: {str(e)}")
 
-    def update_settlement_details_table(self, active_trip_id):
+    def update_settlement_details_table(self, snapshot):
         """Update the settlement details table."""
         try:
             self.settlement_details_table.data = []
-            settlements = self.database.settle_expenses(active_trip_id)
 
-            for payer, receiver, amount in settlements:
+            for payer, receiver, amount in snapshot.settlements:
                 self.settlement_details_table.data.append([payer, receiver, f'{amount:.2f}'])
 
         except Exception as e:
             print(f"Error updating settlement details table: {e}")
             self.show_error(f"Error updating settlement details: {str(e)}")
 
+    async def update_settlements(self):
+        """Recalculate settlements with the newly selected strategy."""
+        snapshot = await self.async_database.get_trip_snapshot(strategy=self.strategy_picker.strategy)
+        if snapshot:
+            self.update_settlement_details_table(snapshot)
+
     def goto_settlement_page(self, sender):
         """Navigate back to the SettlementScreen."""
         self.app.main_window.content = SettlementScreen('settlement', self.app, self.main_screen_layout).layout
@@ -0,0 +1,191 @@
+"""
+Settlement calculations shared by the settlement screens and reports.
+
+Balances are ``(family_name, balance)`` pairs where a negative balance means
+the family owes money and a positive balance means it is owed money.
+Settlements are ``Settlement(payer, receiver, amount)`` records.
+"""
+import heapq
+import time
+from collections import deque
+
+from .records import Settlement
+
+
+def compute_balances(families, total_expenses, total_members):
+    """Turn ``(family_name, num_members, amount_paid)`` rows into balances."""
+    if not total_expenses or not total_members:
+        per_head_cost = 0.0
+    else:
+        per_head_cost = total_expenses / total_members
+    return [
+        (family_name, amount_paid - per_head_cost * num_members)
+        for family_name, num_members, amount_paid in families
+    ]
+
+
+def greedy_settlement(balances):
+    """Pair debtors with creditors in family order.
+
+    Each family is settled against the next one on the other side until one
+    of the two is square, so the whole match is a single O(F) pass.
+    """
+    payers = deque((name, amount) for name, amount in balances if amount < 0)
+    receivers = deque((name, amount) for name, amount in balances if amount > 0)
+    transactions = []
+    while payers and receivers:
+        payer_name, payer_amount = payers.popleft()
+        receiver_name, receiver_amount = receivers.popleft()
+        settlement_amount = min(abs(payer_amount), receiver_amount)
+        transactions.append((payer_name, receiver_name, settlement_amount))
+        payer_amount += settlement_amount
+        receiver_amount -= settlement_amount
+        if payer_amount < 0:
+            payers.appendleft((payer_name, payer_amount))
+        if receiver_amount > 0:
+            receivers.appendleft((receiver_name, receiver_amount))
+    return transactions
+
+
+# Largest number of non-zero balances the exact search will take on
+EXACT_SEARCH_LIMIT = 14
+# Seconds the exact search may run before falling back to the heuristic
+DEFAULT_TIME_BUDGET = 0.5
+
+
+def _to_cents(balances):
+    """Round balances to whole cents, dropping settled families.
+
+    Rounding can leave the total a cent or two off zero; the remainder is
+    absorbed by the largest balance so the groups can still cancel out.
+    """
+    cents = [(name, int(round(amount * 100))) for name, amount in balances]
+    cents = [(name, amount) for name, amount in cents if amount]
+    residue = sum(amount for _, amount in cents)
+    if residue and cents:
+        index = max(range(len(cents)), key=lambda i: abs(cents[i][1]))
+        name, amount = cents[index]
+        cents[index] = (name, amount - residue)
+        cents = [(name, amount) for name, amount in cents if amount]
+    return cents
+
+
+def _from_cents(transactions):
+    return [(payer, receiver, amount / 100) for payer, receiver, amount in transactions]
+
+
+def _zero_sum_groups(cents, deadline):
+    """Split balances into the largest number of groups that each sum to zero.
+
+    Returns ``None`` if the deadline passes before the search finishes.
+    """
+    count = len(cents)
+    full_mask = (1 << count) - 1
+    sums = [0] * (full_mask + 1)
+    best = [0] * (full_mask + 1)
+    parent = [0] * (full_mask + 1)
+    for mask in range(1, full_mask + 1):
+        if not mask & 0x3FF and time.perf_counter() > deadline:
+            return None
+        low_bit = mask & -mask
+        sums[mask] = sums[mask ^ low_bit] + cents[low_bit.bit_length() - 1][1]
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            if best[mask ^ bit] >= best[mask]:
+                best[mask] = best[mask ^ bit]
+                parent[mask] = bit
+            remaining ^= bit
+        if sums[mask] == 0:
+            best[mask] += 1
+
+    groups = []
+    group = []
+    mask = full_mask
+    while mask:
+        bit = parent[mask]
+        group.append(cents[bit.bit_length() - 1])
+        mask ^= bit
+        if sums[mask] == 0:
+            groups.append(list(reversed(group)))
+            group = []
+    groups.reverse()
+    return groups
+
+
+def _heuristic_settlement(cents):
+    """Fast settlement for large groups.
+
+    Equal and opposite balances are paired off first, since each such pair
+    needs exactly one transfer. The rest are settled largest debtor against
+    largest creditor.
+    """
+    transactions = []
+    creditors_by_amount = {}
+    for name, amount in cents:
+        if amount > 0:
+            creditors_by_amount.setdefault(amount, []).append(name)
+
+    debtors = []
+    for name, amount in cents:
+        if amount < 0 and creditors_by_amount.get(-amount):
+            transactions.append((name, creditors_by_amount[-amount].pop(), -amount))
+        elif amount < 0:
+            heapq.heappush(debtors, (amount, name))
+
+    creditors = [(-amount, name) for amount, names in creditors_by_amount.items() for name in names]
+    heapq.heapify(creditors)
+
+    while debtors and creditors:
+        debt, payer_name = heapq.heappop(debtors)
+        credit, receiver_name = heapq.heappop(creditors)
+        settlement_amount = min(-debt, -credit)
+        transactions.append((payer_name, receiver_name, settlement_amount))
+        if debt + settlement_amount < 0:
+            heapq.heappush(debtors, (debt + settlement_amount, payer_name))
+        if credit + settlement_amount < 0:
+            heapq.heappush(creditors, (credit + settlement_amount, receiver_name))
+    return transactions
+
+
+def minimal_settlement(balances, time_budget=DEFAULT_TIME_BUDGET):
+    """Settle the trip with as few transfers as possible.
+
+    A group of k families whose balances cancel out needs k - 1 transfers,
+    so the fewest transfers come from the largest number of such groups.
+    That search is exact for small trips; larger trips, or searches that
+    run past ``time_budget`` seconds, use the heuristic instead.
+    """
+    cents = _to_cents(balances)
+    groups = None
+    if len(cents) <= EXACT_SEARCH_LIMIT:
+        groups = _zero_sum_groups(cents, time.perf_counter() + time_budget)
+    if groups is None:
+        return _from_cents(_heuristic_settlement(cents))
+
+    transactions = []
+    for group in groups:
+        transactions.extend(greedy_settlement(group))
+    return _from_cents(transactions)
+
+
+SETTLEMENT_STRATEGIES = {
+    'greedy': greedy_settlement,
+    'minimal': minimal_settlement,
+}
+
+STRATEGY_LABELS = {
+    'greedy': 'Greedy (family order)',
+    'minimal': 'Fewest transfers',
+}
+
+DEFAULT_STRATEGY = 'greedy'
+
+
+def settle(balances, strategy=DEFAULT_STRATEGY):
+    """Settle balances with the named strategy."""
+    try:
+        settle_function = SETTLEMENT_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown settlement strategy: {strategy}")
+    return [Settlement._make(transaction) for transaction in settle_function(balances)]
@@ -0,0 +1,124 @@
+"""
+Incrementally maintained settlements for one trip.
+
+The service loads a trip's families and what each has paid once, then
+observes its ExpenseTracker's change events as each write happens. Adding
+or deleting an expense adjusts the payer's total and the trip total in
+O(1); balances and the matching phase are only re-run the next time
+settlements are read. Anything else that can move the numbers (family
+edits, bulk imports, rolled-back transactions, commits from other
+connections) triggers a reload.
+"""
+from .observable import ExpenseAdded, ExpenseDeleted, ExpensesReset, FamilyChanged, Observer, TripChanged
+from .settlement_engine import DEFAULT_STRATEGY, compute_balances, settle
+
+
+class SettlementService(Observer):
+    def __init__(self, database, trip_id):
+        self.database = database
+        self.trip_id = trip_id
+        self._stale = True
+        self._data_version = None
+        self.reloads = 0
+        # Uncoalesced, so reads straight after a write already include it
+        database.events.add_observer(self, coalesce=False)
+
+    def reload(self):
+        """Read families, what they paid and the trip totals from the database."""
+        rows = self.database.conn.execute('''
+            SELECT fd.id, fd.family_name, fd.num_members, COALESCE(fb.paid, 0)
+            FROM family_details fd
+            LEFT JOIN family_balances fb ON fb.family_id = fd.id
+            WHERE fd.trip_id = ?
+            ORDER BY fd.id
+        ''', (self.trip_id,)).fetchall()
+        totals = self.database.conn.execute(
+            'SELECT total_expenses, expense_count FROM trip_totals WHERE trip_id = ?',
+            (self.trip_id,)).fetchone()
+
+        self._families = [(family_id, family_name, num_members) for family_id, family_name, num_members, _ in rows]
+        self._paid = {family_id: paid for family_id, _, _, paid in rows}
+        self._total_members = sum(num_members or 0 for _, _, num_members in self._families)
+        self._total_expenses, self._expense_count = totals if totals else (0, 0)
+        self._balances = None
+        self._settlements = {}
+        self._stale = False
+        self._data_version = self._read_data_version()
+        self.reloads += 1
+
+    def update(self, events=()):
+        """Apply change events from writes made through this thread's connection."""
+        for event in events:
+            if isinstance(event, (ExpenseAdded, ExpenseDeleted)):
+                if event.trip_id == self.trip_id and not self._stale:
+                    if isinstance(event, ExpenseAdded):
+                        self._apply(event.payer_id, event.amount, 1)
+                    else:
+                        self._apply(event.payer_id, -event.amount, -1)
+            elif isinstance(event, (ExpensesReset, FamilyChanged, TripChanged)):
+                if event.trip_id in (None, self.trip_id):
+                    self._stale = True
+
+    def _apply(self, payer_id, delta, count):
+        self._expense_count += count
+        self._total_expenses = self._total_expenses + delta if self._expense_count else 0
+        if payer_id in self._paid:
+            self._paid[payer_id] += delta
+        self._balances = None
+        self._settlements = {}
+
+    def _read_data_version(self):
+        return self.database.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _refresh(self):
+        # Our own writes arrive as events; a new data_version means another
+        # connection has committed and the state must be read again
+        if self._stale or self._read_data_version() != self._data_version:
+            self.reload()
+
+    @property
+    def total_expenses(self):
+        """Trip total, or None when there are no expenses."""
+        self._refresh()
+        return self._total_expenses if self._expense_count else None
+
+    @property
+    def total_members(self):
+        self._refresh()
+        return self._total_members if self._families else None
+
+    @property
+    def per_head_cost(self):
+        total_expenses, total_members = self.total_expenses, self.total_members
+        if not total_expenses or not total_members:
+            return None
+        return total_expenses / total_members
+
+    def balances(self):
+        """Return (family_name, balance) pairs in family order."""
+        self._refresh()
+        if self._balances is None:
+            # Families sharing a name share what any of them paid
+            paid_by_name = {}
+            for family_id, family_name, _ in self._families:
+                paid_by_name[family_name] = paid_by_name.get(family_name, 0) + self._paid[family_id]
+            self._balances = compute_balances(
+                [(family_name, num_members, paid_by_name[family_name])
+                 for _, family_name, num_members in self._families],
+                self.total_expenses,
+                self.total_members
+            )
+        return self._balances
+
+    def settlements(self, strategy=DEFAULT_STRATEGY):
+        """Return the settlement for the current balances, matching only when they changed."""
+        balances = self.balances()
+        if strategy not in self._settlements:
+            self._settlements[strategy] = settle(balances, strategy)
+        return self._settlements[strategy]
+
+    def close(self):
+        self.database.events.remove_observer(self)
+
+    def __repr__(self):
+        return f"<SettlementService trip={self.trip_id} families={len(self._families) if not self._stale else '?'}>"
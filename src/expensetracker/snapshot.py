@@ -0,0 +1,57 @@
+"""
+A single aggregate of everything the settlement and report screens show.
+
+The snapshot is built from one read of the trip's families and expenses.
+ExpenseTracker memoizes it per data version, so screens can ask for it
+freely and only pay for it again when the data has actually changed.
+"""
+from .settlement_engine import DEFAULT_STRATEGY, compute_balances, settle
+
+
+class TripSnapshot:
+    def __init__(self, trip, families, expenses, strategy=DEFAULT_STRATEGY, balances=None, settlements=None):
+        self.trip = trip
+        self.families = families
+        self.expenses = expenses
+        self.strategy = strategy
+
+        # Per-family totals in one pass over the expenses, unless the
+        # balances are already known (see SettlementService)
+        family_names = {family.id: family.family_name for family in families} if balances is None else {}
+        paid_by_family = {}
+        total_expenses = 0
+        for expense in expenses:
+            total_expenses += expense.amount
+            family_name = family_names.get(expense.payer_id)
+            if family_name is not None:
+                paid_by_family[family_name] = paid_by_family.get(family_name, 0) + expense.amount
+
+        # None, like SQL SUM, when there is nothing to add up
+        self.total_expenses = total_expenses if expenses else None
+        self.total_members = sum(family.num_members for family in families) if families else None
+        self.family_count = len(families)
+
+        if not self.total_expenses or not self.total_members:
+            self.per_head_cost = None
+        else:
+            self.per_head_cost = self.total_expenses / self.total_members
+
+        if balances is None:
+            balances = compute_balances(
+                [(family.family_name, family.num_members, paid_by_family.get(family.family_name, 0))
+                 for family in families],
+                self.total_expenses,
+                self.total_members
+            )
+        self.balances = balances
+        self.settlements = settle(balances, strategy) if settlements is None else settlements
+
+    @property
+    def trip_id(self):
+        return self.trip.id
+
+    def __repr__(self):
+        return (
+            f"<TripSnapshot trip={self.trip_id} families={self.family_count} "
+            f"expenses={len(self.expenses)} settlements={len(self.settlements)}>"
+        )
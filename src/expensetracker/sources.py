@@ -0,0 +1,134 @@
+"""
+Table data sources backed by the database.
+
+Rows are fetched a page at a time when the table asks for them, and only a
+few pages are kept in memory, so a long expense list costs the same to
+show as a short one. Pages are read with keyset queries, continuing from
+the last row of the page before. The table widget calls into the source
+synchronously, so sources read through the app's main-thread ExpenseTracker.
+
+When a single expense is saved or deleted, the source inserts or removes
+just that row and tells the table, instead of reloading everything.
+"""
+from collections import OrderedDict
+
+from toga.sources import Source
+
+from .database import EXPENSE_PAGE_LIMIT
+
+# Rows fetched per query
+EXPENSE_PAGE_SIZE = EXPENSE_PAGE_LIMIT
+# Pages kept in memory per source
+EXPENSE_PAGE_CACHE = 8
+
+
+class ExpenseRow:
+    """One expense as shown in a table; attributes are the table accessors."""
+
+    def __init__(self, number, expense):
+        self.number = number
+        self.id, self.trip_id, self.name, self.amount, self.date, self.payer_id, self.payer = expense
+        self.amount_text = f'{self.amount:.2f}'
+
+    def __repr__(self):
+        return f"<ExpenseRow {self.number} id={self.id} {self.name!r} {self.amount_text}>"
+
+
+class ExpensePageSource(Source):
+    """The expenses of one trip, in (date, id) order, loaded page by page."""
+
+    def __init__(self, database, trip_id, page_size=EXPENSE_PAGE_SIZE, max_pages=EXPENSE_PAGE_CACHE):
+        super().__init__()
+        self.database = database
+        self.trip_id = trip_id
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._page_ends = {}  # page number -> (date, id) of its last row
+        self._length = None
+
+    def __len__(self):
+        if self._length is None:
+            self._length = self.database.get_expense_count(self.trip_id)
+        return self._length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        page_number, offset = divmod(index, self.page_size)
+        page = self._page(page_number)
+        if offset >= len(page):
+            # The data changed underneath us; the caller should reload
+            raise IndexError(index)
+        return page[offset]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def index(self, row):
+        return row.number - 1
+
+    def _page(self, page_number):
+        page = self._pages.get(page_number)
+        if page is None:
+            start = page_number * self.page_size
+            if page_number == 0:
+                after = None
+            elif page_number - 1 in self._page_ends:
+                after = self._page_ends[page_number - 1]
+            else:
+                # Jumping ahead: find where the previous page ended from the index
+                after = self.database.get_expense_key_at(self.trip_id, start - 1)
+            expenses = self.database.get_expenses_page(self.trip_id, after=after, limit=self.page_size)
+            page = [ExpenseRow(start + offset + 1, expense) for offset, expense in enumerate(expenses)]
+            if expenses:
+                self._page_ends[page_number] = (expenses[-1][4], expenses[-1][0])
+            self._pages[page_number] = page
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+        return page
+
+    def _forget_from(self, page_number):
+        # Rows from this page on have moved; pages before it are still right
+        for number in [number for number in self._pages if number >= page_number]:
+            del self._pages[number]
+        for number in [number for number in self._page_ends if number >= page_number]:
+            del self._page_ends[number]
+
+    def insert_expense(self, expense):
+        """Add a newly saved expense to the table and return its row."""
+        if self._length is None:
+            # Nothing has been read yet, so there is nothing to update
+            return None
+        index = self.database.get_expense_position(self.trip_id, (expense.date, expense.id))
+        self._forget_from(index // self.page_size)
+        self._length += 1
+        row = ExpenseRow(index + 1, expense)
+        self.notify('insert', index=index, item=row)
+        return row
+
+    def remove_expense(self, expense_id):
+        """Take a deleted expense out of the table.
+
+        Returns False if its row has not been read, in which case the
+        caller should reload instead.
+        """
+        row = next((row for page in self._pages.values() for row in page if row.id == expense_id), None)
+        if row is None:
+            return False
+        index = row.number - 1
+        self._forget_from(index // self.page_size)
+        self._length -= 1
+        self.notify('remove', index=index, item=row)
+        return True
+
+    def reload(self):
+        """Forget loaded rows so the next read sees the database as it is now."""
+        self._pages.clear()
+        self._page_ends.clear()
+        self._length = None
@@ -0,0 +1,42 @@
+from toga.style import Pack
+from toga.widgets import selection
+
+from .settlement_engine import DEFAULT_STRATEGY, STRATEGY_LABELS
+
+
+class StrategyPicker:
+    """Selection for the settlement strategy, shared by the screens that settle.
+
+    The chosen strategy is kept on the app so every screen uses the same one.
+    ``on_change`` is awaited after the user picks a new strategy.
+    """
+
+    def __init__(self, app, on_change):
+        self.app = app
+        self.on_change = on_change
+
+        self.selection = selection.Selection(
+            items=list(STRATEGY_LABELS.values()),
+            style=Pack(padding=5, width=200)
+        )
+        self.selection.value = STRATEGY_LABELS[self.strategy]
+        self.selection.on_change = self.change_strategy
+
+    @property
+    def strategy(self):
+        """Return the settlement strategy chosen for this session."""
+        return getattr(self.app, 'settlement_strategy', DEFAULT_STRATEGY)
+
+    def refresh(self):
+        """Show the session's strategy, which another screen may have changed."""
+        # Match the picker to the strategy without firing its change handler
+        self.selection.on_change = None
+        self.selection.value = STRATEGY_LABELS[self.strategy]
+        self.selection.on_change = self.change_strategy
+
+    async def change_strategy(self, widget):
+        """Store the newly selected strategy and let the screen update."""
+        for strategy, strategy_label in STRATEGY_LABELS.items():
+            if strategy_label == widget.value:
+                self.app.settlement_strategy = strategy
+        await self.on_change()
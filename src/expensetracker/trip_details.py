@@ -62,6 +62,6 @@ class TripDetailsScreen:
     def display_family_details(self, family_details):
         for family in family_details:
             self.family_details_layout.add(label.Label('Family Name:', style=Pack(font_size=20)))
-            self.family_details_layout.add(label.Label(family[1], style=Pack(font_size=20)))
+            self.family_details_layout.add(label.Label(family.family_name, style=Pack(font_size=20)))
             self.family_details_layout.add(label.Label('Number of Members:', style=Pack(font_size=20)))
-            self.family_details_layout.add(label.Label(str(family[2]), style=Pack(font_size=20)))
+            self.family_details_layout.add(label.Label(str(family.num_members), style=Pack(font_size=20)))
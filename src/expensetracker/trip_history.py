@@ -15,6 +15,7 @@ class TripHistoryScreen:
             self.name = name
             self.main_screen_layout = main_screen_layout
             self.database = app.database
+            self.async_database = app.async_database
 
             # Main layout with scrolling
             self.layout = toga.ScrollContainer(style=Pack(flex=1))
@@ -44,36 +45,41 @@ class TripHistoryScreen:
             # Set the scrollable content
             self.layout.content = self.content_box
 
-            # Load trip history
-            self.load_history()
+            # Load trip history in the background
+            self.history_container.add(toga.Label(
+                'Loading trip history...',
+                style=Pack(padding=10, font_size=14)
+            ))
+            self.app.loop.create_task(self.load_history())
             print("TripHistoryScreen initialized successfully")
 
         except Exception as e:
             print(f"Error initializing TripHistoryScreen: {e}")
             self.show_error(f"Error initializing screen: {str(e)}")
 
-    def load_history(self):
-        """Load archived trips history"""
+    def refresh(self):
+        """Reload the trip history after the data has changed."""
+        self.app.loop.create_task(self.load_history())
+
+    async def load_history(self):
+        """Load ended trips history"""
         try:
             print("Loading trip history...")
+
+            # Get ended trips from database
+            ended_trips = await self.async_database.get_ended_trips()
             self.history_container.clear()
             self.message_container.clear()
 
-            # Get archived trips from database
-            self.database.cursor.execute(
-                "SELECT trip_name, archive_path, archived_date FROM archived_trips ORDER BY archived_date DESC"
-            )
-            archived_trips = self.database.cursor.fetchall()
-
-            if not archived_trips:
+            if not ended_trips:
                 no_history_label = toga.Label(
-                    'No archived trips found',
+                    'No past trips found',
                     style=Pack(padding=10, font_size=14)
                 )
                 self.history_container.add(no_history_label)
                 return
 
-            for trip_name, archive_path, archived_date in archived_trips:
+            for trip_id, trip_name, start_date, ended_date in ended_trips:
                 # Create trip container with mobile-friendly styling
                 trip_box = toga.Box(
                     style=Pack(
@@ -91,7 +97,7 @@ class TripHistoryScreen:
                     style=Pack(padding=(0, 2), font_size=14, font_weight='bold')
                 ))
                 details_box.add(toga.Label(
-                    f"Archived: {archived_date}",
+                    f"Ended: {ended_date}",
                     style=Pack(padding=(0, 2), font_size=12)
                 ))
                 trip_box.add(details_box)
@@ -102,15 +108,23 @@ class TripHistoryScreen:
                 # Load button
                 load_button = toga.Button(
                     'Load',
-                    on_press=lambda x, path=archive_path: self.load_archive(path),
+                    on_press=lambda x, trip_id=trip_id: self.load_trip(trip_id),
                     style=Pack(padding=2, width=60, height=30)
                 )
                 button_box.add(load_button)
 
+                # Export button
+                export_button = toga.Button(
+                    'Export',
+                    on_press=lambda x, trip_id=trip_id: self.export_trip(trip_id),
+                    style=Pack(padding=2, width=60, height=30)
+                )
+                button_box.add(export_button)
+
                 # Delete button
                 delete_button = toga.Button(
                     'Delete',
-                    on_press=lambda x, path=archive_path: self.delete_archive(path),
+                    on_press=lambda x, trip_id=trip_id: self.delete_trip(trip_id),
                     style=Pack(padding=2, width=60, height=30)
                 )
                 button_box.add(delete_button)
@@ -124,26 +138,26 @@ class TripHistoryScreen:
             print(f"Error loading trip history: {e}")
             self.show_error(f"Error loading trip history: {str(e)}")
 
-    def load_archive(self, archive_path):
-        """Load an archived trip"""
+    def load_trip(self, trip_id):
+        """Make an ended trip the active one again"""
         try:
-            print(f"Loading archive: {archive_path}")
+            print(f"Loading trip: {trip_id}")
 
             # Show confirmation dialog
             confirm_box = toga.Box(style=Pack(direction=COLUMN, padding=5))
             confirm_label = toga.Label(
-                'Loading this archive will replace the current trip. Continue?',
+                'Loading this trip will end the current trip. Continue?',
                 style=Pack(padding=5)
             )
             confirm_box.add(confirm_label)
 
             def confirm_load(sender):
                 try:
-                    self.database.load_archived_trip(archive_path)
-                    self.show_success("Archive loaded successfully!")
+                    self.database.reactivate_trip(trip_id)
+                    self.show_success("Trip loaded successfully!")
                     self.goto_main(None)
                 except Exception as e:
-                    self.show_error(f"Error loading archive: {str(e)}")
+                    self.show_error(f"Error loading trip: {str(e)}")
                 finally:
                     self.content_box.remove(confirm_box)
 
@@ -170,29 +184,59 @@ class TripHistoryScreen:
             self.content_box.add(confirm_box)
 
         except Exception as e:
-            print(f"Error in load_archive: {e}")
-            self.show_error(f"Error loading archive: {str(e)}")
+            print(f"Error in load_trip: {e}")
+            self.show_error(f"Error loading trip: {str(e)}")
+
+    def export_trip(self, trip_id):
+        """Export an ended trip to an archive file"""
+        print(f"Exporting trip: {trip_id}")
+        self.app.loop.create_task(self.run_export(trip_id))
+
+    async def run_export(self, trip_id):
+        """Copy the trip on the database thread, showing progress as it goes"""
+        loop = self.app.loop
 
-    def delete_archive(self, archive_path):
-        """Delete an archived trip"""
+        def progress(copied_pages, total_pages):
+            # Called on the database thread; widgets are only touched on the UI thread
+            loop.call_soon_threadsafe(self.show_export_progress, copied_pages, total_pages)
+
+        try:
+            archive_filename = await self.async_database.run(
+                lambda database: database.archive_trip(trip_id, progress=progress))
+            self.show_success(f"Trip exported to {archive_filename}")
+        except Exception as e:
+            print(f"Error in export_trip: {e}")
+            self.show_error(f"Error exporting trip: {str(e)}")
+
+    def show_export_progress(self, copied_pages, total_pages):
+        """Show how far the export copy has got"""
+        percent = int(copied_pages * 100 / total_pages) if total_pages else 100
+        self.message_container.clear()
+        self.message_container.add(toga.Label(
+            f'Exporting trip... {percent}%',
+            style=Pack(padding=3, font_size=14)
+        ))
+
+    def delete_trip(self, trip_id):
+        """Delete an ended trip"""
         try:
-            print(f"Deleting archive: {archive_path}")
+            print(f"Deleting trip: {trip_id}")
 
             # Show confirmation dialog
             confirm_box = toga.Box(style=Pack(direction=COLUMN, padding=5))
             confirm_label = toga.Label(
-                'Are you sure you want to delete this archived trip?',
+                'Are you sure you want to delete this trip?',
                 style=Pack(padding=5)
             )
             confirm_box.add(confirm_label)
 
             def confirm_delete(sender):
                 try:
-                    self.database.delete_archive(archive_path)
-                    self.show_success("Archive deleted successfully!")
-                    self.load_history()
+                    self.database.delete_trip(trip_id)
+                    self.show_success("Trip deleted successfully!")
+                    self.app.loop.create_task(self.load_history())
                 except Exception as e:
-                    self.show_error(f"Error deleting archive: {str(e)}")
+                    self.show_error(f"Error deleting trip: {str(e)}")
                 finally:
                     self.content_box.remove(confirm_box)
 
@@ -219,8 +263,8 @@ class TripHistoryScreen:
             self.content_box.add(confirm_box)
 
         except Exception as e:
-            print(f"Error in delete_archive: {e}")
-            self.show_error(f"Error deleting archive: {str(e)}")
+            print(f"Error in delete_trip: {e}")
+            self.show_error(f"Error deleting trip: {str(e)}")
 
     def show_error(self, message):
         """Show error message"""
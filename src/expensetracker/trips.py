@@ -72,7 +72,7 @@ class TripListScreen:
             print(f"Active trip retrieved: {active_trip}")
 
             if active_trip:
-                trip_id = active_trip[0]
+                trip_id = active_trip.id
 
                 # Main trip box
                 trip_box = toga.Box(style=Pack(direction=COLUMN, padding=10))
@@ -80,15 +80,15 @@ class TripListScreen:
                 # Trip details section
                 trip_details = toga.Box(style=Pack(direction=COLUMN, padding=5))
                 trip_details.add(toga.Label(
-                    f'Current Trip Name: {active_trip[1]}',
+                    f'Current Trip Name: {active_trip.name}',
                     style=Pack(padding=(0, 10), font_weight='bold')
                 ))
                 trip_details.add(toga.Label(
-                    f'Trip Type: {active_trip[3]}',
+                    f'Trip Type: {active_trip.trip_type}',
                     style=Pack(padding=(0, 10))
                 ))
                 trip_details.add(toga.Label(
-                    f'Start Date: {active_trip[2]}',
+                    f'Start Date: {active_trip.start_date}',
                     style=Pack(padding=(0, 10))
                 ))
                 trip_box.add(trip_details)
@@ -121,13 +121,17 @@ class TripListScreen:
             print(f"Error updating trip list: {e}")
             self.show_error(f"Error loading trip data: {str(e)}")
 
+    def refresh(self):
+        """Reload the screen after the data has changed."""
+        self.update_trip_list()
+
     def create_family_box(self, family):
         """Create a box to display family details."""
         try:
             # Unpack family details
-            family_id = family[0]
-            family_name = family[1]
-            num_members = family[2]
+            family_id = family.id
+            family_name = family.family_name
+            num_members = family.num_members
 
             # Create a container for the family details
             family_box = toga.Box(style=Pack(direction=ROW, padding=5, background_color="#f9f9f9"))
@@ -191,12 +195,11 @@ class TripListScreen:
             # Buttons container
             button_box = toga.Box(style=Pack(direction=ROW, padding=5))
 
-            def confirm_delete(sender):
+            async def confirm_delete(sender):
                 """Handle 'Yes' button click."""
                 try:
                     # Delete the family record from the database
-                    expense_tracker = ExpenseTracker('expense_tracker.db')
-                    expense_tracker.delete_family_record(family_id)
+                    await self.app.write_queue.write('delete_family_record', family_id)
 
                     # Show success message and refresh the trip list
                     self.show_success("Family deleted successfully!")
@@ -322,6 +325,10 @@ class CreateTripScreen:
 
         self.layout.add(button_container)
 
+    def refresh(self):
+        """Clear messages left from the last visit; the form shows no stored data."""
+        self.message_container.clear()
+
     def create_trip(self, sender):
         """Handle creating a new trip."""
         try:
@@ -348,7 +355,7 @@ class CreateTripScreen:
                 message_box = toga.Box(style=Pack(direction=COLUMN, padding=10))
 
                 warning_label = toga.Label(
-                    f'Only one active trip is allowed. Current trip: {active_trip[1]}',
+                    f'Only one active trip is allowed. Current trip: {active_trip.name}',
                     style=Pack(padding=5, color='red')
                 )
                 message_box.add(warning_label)
@@ -363,7 +370,6 @@ class CreateTripScreen:
                 self.message_container.add(message_box)
             else:
                 # No active trip, create a new one
-                self.database.clear_family_details()  # Clear previous family details
                 self.database.save_trip(trip_name, trip_start_date, 'Family', None, None, 0)
                 self.show_success("Trip created successfully!")
                 self.goto_main(None)
@@ -373,23 +379,20 @@ class CreateTripScreen:
             self.show_error(f"Error creating trip: {str(e)}")
 
     def exit_trip(self, active_trip):
-        """Archive current trip and create new one."""
+        """End current trip and create new one."""
         try:
-            # Archive current trip
-            archive_path = self.database.archive_trip()
-
-            # Clear current trip data
-            self.database.clear_trips()
-            self.database.clear_expenses()
-            self.database.clear_family_details()
-
-            # Create new trip
             trip_name = self.trip_name_input.value.strip()
             trip_start_date = self.trip_start_date_input.value.strip()
-            self.database.save_trip(trip_name, trip_start_date, 'Family', None, None, 0)
+
+            # End the current trip and create the new one in one commit, so a
+            # failure cannot leave the app without an active trip
+            with self.database.transaction():
+                # The ended trip's data stays available in Trip History
+                self.database.end_trip(active_trip.id)
+                self.database.save_trip(trip_name, trip_start_date, 'Family', None, None, 0)
 
             # Show success message
-            self.show_success(f"Previous trip archived. New trip created successfully!")
+            self.show_success(f"Previous trip ended. New trip created successfully!")
             self.goto_main(None)
 
         except Exception as e:
@@ -431,6 +434,7 @@ class TripHistoryScreen:
             self.name = name
             self.main_screen_layout = main_screen_layout
             self.database = app.database
+            self.async_database = app.async_database
 
             # Main layout with scrolling
             self.layout = toga.ScrollContainer(style=Pack(flex=1))
@@ -460,36 +464,41 @@ class TripHistoryScreen:
             # Set the scrollable content
             self.layout.content = self.content_box
 
-            # Load trip history
-            self.load_history()
+            # Load trip history in the background
+            self.history_container.add(toga.Label(
+                'Loading trip history...',
+                style=Pack(padding=10, font_size=14)
+            ))
+            self.app.loop.create_task(self.load_history())
             print("TripHistoryScreen initialized successfully")
 
         except Exception as e:
             print(f"Error initializing TripHistoryScreen: {e}")
             self.show_error(f"Error initializing screen: {str(e)}")
 
-    def load_history(self):
-        """Load archived trips history"""
+    def refresh(self):
+        """Reload the trip history after the data has changed."""
+        self.app.loop.create_task(self.load_history())
+
+    async def load_history(self):
+        """Load ended trips history"""
         try:
             print("Loading trip history...")
+
+            # Get ended trips from database
+            ended_trips = await self.async_database.get_ended_trips()
             self.history_container.clear()
             self.message_container.clear()
 
-            # Get archived trips from database
-            self.database.cursor.execute(
-                "SELECT trip_name, archive_path, archived_date FROM archived_trips ORDER BY archived_date DESC"
-            )
-            archived_trips = self.database.cursor.fetchall()
-
-            if not archived_trips:
+            if not ended_trips:
                 no_history_label = toga.Label(
-                    'No archived trips found',
+                    'No past trips found',
                     style=Pack(padding=10, font_size=14)
                 )
                 self.history_container.add(no_history_label)
                 return
 
-            for trip_name, archive_path, archived_date in archived_trips:
+            for trip_id, trip_name, start_date, ended_date in ended_trips:
                 # Create trip container with mobile-friendly styling
                 trip_box = toga.Box(
                     style=Pack(
@@ -507,7 +516,7 @@ class TripHistoryScreen:
                     style=Pack(padding=(0, 2), font_size=14, font_weight='bold')
                 ))
                 details_box.add(toga.Label(
-                    f"Archived: {archived_date}",
+                    f"Ended: {ended_date}",
                     style=Pack(padding=(0, 2), font_size=12)
                 ))
                 trip_box.add(details_box)
@@ -518,15 +527,23 @@ class TripHistoryScreen:
                 # Load button
                 load_button = toga.Button(
                     'Load',
-                    on_press=lambda x, path=archive_path: self.load_archive(path),
+                    on_press=lambda x, trip_id=trip_id: self.load_trip(trip_id),
                     style=Pack(padding=2, width=60, height=30)
                 )
                 button_box.add(load_button)
 
+                # Export button
+                export_button = toga.Button(
+                    'Export',
+                    on_press=lambda x, trip_id=trip_id: self.export_trip(trip_id),
+                    style=Pack(padding=2, width=60, height=30)
+                )
+                button_box.add(export_button)
+
                 # Delete button
                 delete_button = toga.Button(
                     'Delete',
-                    on_press=lambda x, path=archive_path: self.delete_archive(path),
+                    on_press=lambda x, trip_id=trip_id: self.delete_trip(trip_id),
                     style=Pack(padding=2, width=60, height=30)
                 )
                 button_box.add(delete_button)
@@ -540,26 +557,26 @@ class TripHistoryScreen:
             print(f"Error loading trip history: {e}")
             self.show_error(f"Error loading trip history: {str(e)}")
 
-    def load_archive(self, archive_path):
-        """Load an archived trip"""
+    def load_trip(self, trip_id):
+        """Make an ended trip the active one again"""
         try:
-            print(f"Loading archive: {archive_path}")
+            print(f"Loading trip: {trip_id}")
 
             # Show confirmation dialog
             confirm_box = toga.Box(style=Pack(direction=COLUMN, padding=5))
             confirm_label = toga.Label(
-                'Loading this archive will replace the current trip. Continue?',
+                'Loading this trip will end the current trip. Continue?',
                 style=Pack(padding=5)
             )
             confirm_box.add(confirm_label)
 
             def confirm_load(sender):
                 try:
-                    self.database.load_archived_trip(archive_path)
-                    self.show_success("Archive loaded successfully!")
+                    self.database.reactivate_trip(trip_id)
+                    self.show_success("Trip loaded successfully!")
                     self.goto_main(None)
                 except Exception as e:
-                    self.show_error(f"Error loading archive: {str(e)}")
+                    self.show_error(f"Error loading trip: {str(e)}")
                 finally:
                     self.content_box.remove(confirm_box)
 
@@ -586,29 +603,59 @@ class TripHistoryScreen:
             self.content_box.add(confirm_box)
 
         except Exception as e:
-            print(f"Error in load_archive: {e}")
-            self.show_error(f"Error loading archive: {str(e)}")
+            print(f"Error in load_trip: {e}")
+            self.show_error(f"Error loading trip: {str(e)}")
+
+    def export_trip(self, trip_id):
+        """Export an ended trip to an archive file"""
+        print(f"Exporting trip: {trip_id}")
+        self.app.loop.create_task(self.run_export(trip_id))
+
+    async def run_export(self, trip_id):
+        """Copy the trip on the database thread, showing progress as it goes"""
+        loop = self.app.loop
+
+        def progress(copied_pages, total_pages):
+            # Called on the database thread; widgets are only touched on the UI thread
+            loop.call_soon_threadsafe(self.show_export_progress, copied_pages, total_pages)
+
+        try:
+            archive_filename = await self.async_database.run(
+                lambda database: database.archive_trip(trip_id, progress=progress))
+            self.show_success(f"Trip exported to {archive_filename}")
+        except Exception as e:
+            print(f"Error in export_trip: {e}")
+            self.show_error(f"Error exporting trip: {str(e)}")
 
-    def delete_archive(self, archive_path):
-        """Delete an archived trip"""
+    def show_export_progress(self, copied_pages, total_pages):
+        """Show how far the export copy has got"""
+        percent = int(copied_pages * 100 / total_pages) if total_pages else 100
+        self.message_container.clear()
+        self.message_container.add(toga.Label(
+            f'Exporting trip... {percent}%',
+            style=Pack(padding=3, font_size=14)
+        ))
+
+    def delete_trip(self, trip_id):
+        """Delete an ended trip"""
         try:
-            print(f"Deleting archive: {archive_path}")
+            print(f"Deleting trip: {trip_id}")
 
             # Show confirmation dialog
             confirm_box = toga.Box(style=Pack(direction=COLUMN, padding=5))
             confirm_label = toga.Label(
-                'Are you sure you want to delete this archived trip?',
+                'Are you sure you want to delete this trip?',
                 style=Pack(padding=5)
             )
             confirm_box.add(confirm_label)
 
             def confirm_delete(sender):
                 try:
-                    self.database.delete_archive(archive_path)
-                    self.show_success("Archive deleted successfully!")
-                    self.load_history()
+                    self.database.delete_trip(trip_id)
+                    self.show_success("Trip deleted successfully!")
+                    self.app.loop.create_task(self.load_history())
                 except Exception as e:
-                    self.show_error(f"Error deleting archive: {str(e)}")
+                    self.show_error(f"Error deleting trip: {str(e)}")
                 finally:
                     self.content_box.remove(confirm_box)
 
@@ -635,8 +682,8 @@ class TripHistoryScreen:
             self.content_box.add(confirm_box)
 
         except Exception as e:
-            print(f"Error in delete_archive: {e}")
-            self.show_error(f"Error deleting archive: {str(e)}")
+            print(f"Error in delete_trip: {e}")
+            self.show_error(f"Error deleting trip: {str(e)}")
 
     def show_error(self, message):
         """Show error message"""
@@ -762,7 +809,7 @@ class AddFamilyScreen:
         except Exception as e:
             print(f"Error navigating back to main screen: {e}")
 
-    def add_family(self, sender):
+    async def add_family(self, sender):
         """Add a new family and navigate back."""
         try:
             family_name = self.family_name_input.value
@@ -773,8 +820,12 @@ class AddFamilyScreen:
                 self.show_error("Please fill in all fields")
                 return
 
-            # Save family details using the existing database instance
-            self.database.save_family_details(family_name, int(num_members), 1)
+            # Save family details against the active trip
+            trip_id = self.database.get_active_trip_id()
+            if trip_id is None:
+                self.show_error("No active trip found. Please create a trip first.")
+                return
+            await self.app.write_queue.write('save_family_details', family_name, int(num_members), trip_id)
 
             # Navigate back to the calling screen
             self.goto_main(sender)
@@ -0,0 +1,34 @@
+"""
+Expense validation shared by the entry screen and the importers.
+"""
+import math
+from datetime import datetime
+
+EXPENSE_DATE_FORMAT = '%Y-%m-%d'
+
+
+def validate_expense(name, amount, date, payer_name):
+    """Check an expense the same way the entry form does.
+
+    Returns the amount as a float, or raises ValueError with a message that
+    can be shown to the user.
+    """
+    if not all([name, amount, date, payer_name]):
+        raise ValueError("Please fill in all fields")
+
+    try:
+        float_amount = float(amount)
+    except (TypeError, ValueError):
+        raise ValueError("Amount must be a valid number")
+    if not math.isfinite(float_amount):
+        # nan and inf parse as floats but cannot be summed into trip totals
+        raise ValueError("Amount must be a valid number")
+    if float_amount <= 0:
+        raise ValueError("Amount must be greater than zero")
+
+    try:
+        datetime.strptime(date, EXPENSE_DATE_FORMAT)
+    except (TypeError, ValueError):
+        raise ValueError("Date must be in YYYY-MM-DD format")
+
+    return float_amount
@@ -0,0 +1,101 @@
+"""
+Group commit for database writes.
+
+Screens hand writes to the queue instead of calling ExpenseTracker directly.
+Writes are collected for a short interval, or until enough have queued up,
+and then run on the database thread inside a single transaction, so a burst
+of expenses costs one commit instead of one per row.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# Seconds a write may wait for others before the batch is committed
+DEFAULT_FLUSH_INTERVAL = 0.05
+# Number of queued writes that triggers an immediate commit
+DEFAULT_MAX_BATCH = 200
+
+
+class WriteQueue:
+    def __init__(self, async_database, flush_interval=DEFAULT_FLUSH_INTERVAL, max_batch=DEFAULT_MAX_BATCH):
+        self.async_database = async_database
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._closed = False
+
+    def submit(self, method_name, *args, **kwargs):
+        """Queue ``ExpenseTracker.<method_name>(*args, **kwargs)``.
+
+        Returns a concurrent.futures.Future that resolves to the method's
+        result once the batch holding it has been committed.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            self._pending.append((method_name, args, kwargs, future))
+            batch_full = len(self._pending) >= self.max_batch
+            if not batch_full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch_full:
+            self.flush()
+        return future
+
+    def write(self, method_name, *args, **kwargs):
+        """Like submit, but returns an awaitable for use in async handlers."""
+        return asyncio.wrap_future(self.submit(method_name, *args, **kwargs))
+
+    def flush(self):
+        """Send every queued write to the database thread as one transaction.
+
+        Returns a Future that completes once the batch has been committed.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            done = Future()
+            done.set_result(None)
+            return done
+        return self.async_database.submit(self._commit_batch, pending)
+
+    def close(self):
+        """Stop accepting writes and wait for everything queued to be committed."""
+        with self._lock:
+            self._closed = True
+        self.flush().result()
+
+    @staticmethod
+    def _commit_batch(database, pending):
+        # Each write gets its own savepoint so one failure does not undo the rest
+        results = []
+        try:
+            with database.transaction():
+                for method_name, args, kwargs, future in pending:
+                    try:
+                        with database.transaction():
+                            result = getattr(database, method_name)(*args, **kwargs)
+                    except Exception as e:
+                        results.append((future, None, e))
+                    else:
+                        results.append((future, result, None))
+        except Exception as e:
+            # The commit itself failed, so none of the writes were saved
+            print(f"Error committing queued writes: {e}")
+            for _, _, _, future in pending:
+                future.set_exception(e)
+            return
+
+        # Only report success once the writes are durable
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
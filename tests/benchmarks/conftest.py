@@ -0,0 +1,30 @@
+"""
+Benchmarks run with the rest of the tests and print what they measure;
+run ``pytest -s tests/benchmarks`` to see the numbers. Their time limits
+are loose ceilings meant to catch a return to per-row work, not to rank
+machines.
+"""
+import random
+
+import pytest
+
+
+@pytest.fixture
+def make_trip():
+    """Return a function that fills a tracker with an active trip of random data."""
+    def make_trip(database, families, expenses, seed=0):
+        rng = random.Random(seed)
+        database.save_trip('Benchmark', '2024-01-01', 'Family', None, None, 0)
+        trip_id = database.get_active_trip_id()
+        with database.transaction():
+            database.conn.executemany(
+                'INSERT INTO family_details (family_name, num_members, trip_id) VALUES (?, ?, ?)',
+                ((f'Family {i}', 1 + i % 4, trip_id) for i in range(families)))
+        family_ids = [row[0] for row in database.conn.execute(
+            'SELECT id FROM family_details WHERE trip_id = ?', (trip_id,))]
+        database.import_expenses(
+            (trip_id, f'Expense {i}', rng.randint(100, 10000) / 100, f'2024-01-{i % 28 + 1:02d}',
+             rng.choice(family_ids))
+            for i in range(expenses))
+        return trip_id
+    return make_trip
@@ -0,0 +1,35 @@
+import sqlite3
+import tracemalloc
+
+from expensetracker.database import EXPENSE_QUERY
+
+ROWS = 20000
+
+
+def bytes_per_row(read):
+    tracemalloc.start()
+    try:
+        rows = read()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(rows) == ROWS
+    return size / ROWS
+
+
+def test_expense_records_cost_no_more_than_tuples(database, make_trip):
+    trip_id = make_trip(database, 10, ROWS)
+    query = EXPENSE_QUERY + 'WHERE expenses.trip_id = ? ORDER BY expenses.id'
+
+    tuples = bytes_per_row(lambda: database.conn.execute(query, (trip_id,)).fetchall())
+    records = bytes_per_row(lambda: database.get_expenses(trip_id))
+    database.conn.row_factory = sqlite3.Row
+    try:
+        mappings = bytes_per_row(lambda: database.conn.execute(query, (trip_id,)).fetchall())
+    finally:
+        database.conn.row_factory = None
+
+    print(f"\nper row: tuple {tuples:.0f} B, Expense {records:.0f} B, sqlite3.Row {mappings:.0f} B")
+    # Records are tuples underneath: no per-row __dict__
+    assert records < tuples * 1.1
+    assert records < mappings
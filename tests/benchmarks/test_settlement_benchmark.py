@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+# Ceiling for settling the largest trip from a cold start, in seconds
+SETTLEMENT_BUDGET = 5.0
+
+
+def settle_cold(database, trip_id):
+    """Reload a trip's settlement service and settle it, as after a restart."""
+    database.get_settlement_service(trip_id).reload()
+    return database.settle_expenses(trip_id)
+
+
+@pytest.mark.parametrize('families', [10, 1000, 100000])
+def test_settlement_scales_with_families(database, make_trip, families):
+    trip_id = make_trip(database, families, families)
+
+    start = time.perf_counter()
+    settlements = settle_cold(database, trip_id)
+    elapsed = time.perf_counter() - start
+    print(f"\nsettle {families} families: {elapsed * 1000:.1f} ms, {len(settlements)} transfers")
+    assert elapsed < SETTLEMENT_BUDGET
+    assert len(settlements) < families
+
+
+def test_settlement_query_count_does_not_grow_with_families(database, make_trip):
+    # One aggregate query for the families, not one query per family
+    counts = []
+    for families in (10, 1000):
+        trip_id = make_trip(database, families, families)
+        statements = []
+        database.conn.set_trace_callback(statements.append)
+        try:
+            settle_cold(database, trip_id)
+        finally:
+            database.conn.set_trace_callback(None)
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
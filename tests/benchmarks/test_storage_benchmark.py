@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from expensetracker.database import STORAGE_PROFILES, ExpenseTracker
+
+# Single-row commits per profile; each is its own transaction
+INSERTS = 200
+# Floor for any profile, in rows per second, to catch a missing WAL setup
+MIN_ROWS_PER_SECOND = 50
+
+
+@pytest.mark.parametrize('storage_profile', sorted(STORAGE_PROFILES))
+def test_insert_and_read_throughput(tmp_path, storage_profile):
+    database = ExpenseTracker(db_path=str(tmp_path / 'expensetracker.db'), storage_profile=storage_profile)
+    try:
+        assert database.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        database.save_trip('Benchmark', '2024-01-01', 'Family', None, None, 0)
+        trip_id = database.get_active_trip_id()
+        database.save_family_details('A', 2, trip_id)
+        payer_id = database.get_family_id('A', trip_id)
+
+        start = time.perf_counter()
+        for i in range(INSERTS):
+            database.save_expense(trip_id, f'Expense {i}', 1.0, f'2024-01-{i % 28 + 1:02d}', payer_id)
+        inserts_per_second = INSERTS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rows, after = 0, None
+        while True:
+            page = database.get_expenses_page(trip_id, after=after, limit=20)
+            if not page:
+                break
+            rows += len(page)
+            after = (page[-1].date, page[-1].id)
+        reads_per_second = rows / (time.perf_counter() - start)
+
+        print(f"\n{storage_profile}: {inserts_per_second:.0f} inserts/s, {reads_per_second:.0f} rows read/s")
+        assert rows == INSERTS
+        assert inserts_per_second > MIN_ROWS_PER_SECOND
+        assert reads_per_second > MIN_ROWS_PER_SECOND
+    finally:
+        database.close()
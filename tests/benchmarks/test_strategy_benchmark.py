@@ -0,0 +1,40 @@
+import random
+import time
+
+import pytest
+
+from expensetracker.settlement_engine import (
+    DEFAULT_TIME_BUDGET, EXACT_SEARCH_LIMIT, greedy_settlement, minimal_settlement)
+
+# Extra seconds the minimal strategy may take over its time budget
+BUDGET_SLACK = 0.5
+
+
+def random_balances(count, seed=0):
+    rng = random.Random(seed)
+    amounts = [rng.randint(-20, 20) * 5.0 for _ in range(count - 1)]
+    amounts.append(-sum(amounts))
+    return [(f'Family {i}', amount) for i, amount in enumerate(amounts)]
+
+
+@pytest.mark.parametrize('families', [6, 10, EXACT_SEARCH_LIMIT, 50, 1000, 10000])
+def test_transfer_count_against_runtime(families):
+    balances = random_balances(families)
+    results = {}
+    for name, strategy in (('greedy', greedy_settlement), ('minimal', minimal_settlement)):
+        start = time.perf_counter()
+        transfers = len(strategy(balances))
+        results[name] = (transfers, time.perf_counter() - start)
+    print('\n' + ', '.join(
+        f"{name} {transfers} transfers in {elapsed * 1000:.1f} ms"
+        for name, (transfers, elapsed) in results.items()) + f" ({families} families)")
+
+    assert results['minimal'][0] <= results['greedy'][0]
+    assert results['minimal'][1] < DEFAULT_TIME_BUDGET + BUDGET_SLACK
+
+
+def test_time_budget_is_respected():
+    balances = random_balances(EXACT_SEARCH_LIMIT, seed=1)
+    start = time.perf_counter()
+    minimal_settlement(balances, time_budget=0.001)
+    assert time.perf_counter() - start < 0.001 + BUDGET_SLACK
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Run against the source tree without installing the app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from expensetracker.database import ExpenseTracker  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'expensetracker.db')
+
+
+@pytest.fixture
+def database(db_path):
+    database = ExpenseTracker(db_path=db_path)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def trip(database):
+    """An active trip with two families; returns (trip_id, [family ids])."""
+    database.save_trip('Trip', '2024-01-01', 'Family', None, None, 0)
+    trip_id = database.get_active_trip_id()
+    database.save_family_details('A', 2, trip_id)
+    database.save_family_details('B', 3, trip_id)
+    return trip_id, [family.id for family in database.get_family_details(trip_id)]
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from expensetracker.database import ExpenseTracker
+
+# The layout archive files had before trips were kept in the main database
+LEGACY_ARCHIVE_SCHEMA = '''
+    CREATE TABLE trips (
+        id INTEGER PRIMARY KEY, name TEXT, start_date DATE, trip_type TEXT, family_name TEXT,
+        individual_name TEXT, num_family_members INTEGER, status TEXT DEFAULT 'INACTIVE'
+    );
+    CREATE TABLE expenses (
+        id INTEGER PRIMARY KEY, trip_id INTEGER, name TEXT, amount REAL, date DATE, trip_type TEXT,
+        payer_id INTEGER
+    );
+    CREATE TABLE family_details (id INTEGER PRIMARY KEY, name TEXT, members INTEGER);
+'''
+
+
+def make_legacy_archive(path, expenses_table=None):
+    conn = sqlite3.connect(path)
+    schema = LEGACY_ARCHIVE_SCHEMA
+    if expenses_table is not None:
+        schema = schema.replace(schema[schema.index('CREATE TABLE expenses'):schema.index('CREATE TABLE family')],
+                                expenses_table)
+    conn.executescript(schema)
+    conn.execute("INSERT INTO trips (id, name, start_date, trip_type, status) "
+                 "VALUES (1, 'Goa', '2023-05-01', 'Family', 'active')")
+    conn.executemany("INSERT INTO family_details (id, name, members) VALUES (?, ?, ?)",
+                     [(1, 'Menon', 4), (2, 'Nair', 2)])
+    if expenses_table is None:
+        conn.executemany("INSERT INTO expenses (trip_id, name, amount, date, payer_id) VALUES (1, ?, ?, ?, ?)",
+                         [('Hotel', 300.0, '2023-05-01', 1), ('Boat', 60.0, '2023-05-02', 2),
+                          ('Dinner', 90.0, '2023-05-02', 1)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def trip_rows(database):
+    return database.conn.execute('SELECT id, name, status FROM trips ORDER BY id').fetchall()
+
+
+def test_legacy_archive_is_imported_into_a_new_trip(database, trip, tmp_path):
+    trip_id, families = trip
+    archive = make_legacy_archive(tmp_path / 'legacy.db')
+
+    new_trip_id = database.import_archive(archive)
+    assert new_trip_id != trip_id
+    assert database.get_active_trip_id() == trip_id
+    assert database.get_trip(new_trip_id).status == 'archived'
+
+    # name/members become family_name/num_members, with ids moved past the existing families
+    imported = database.get_family_details(new_trip_id)
+    assert [(family.family_name, family.num_members) for family in imported] == [('Menon', 4), ('Nair', 2)]
+    assert min(family.id for family in imported) > max(families)
+
+    # Expenses point at the moved families
+    expenses = database.get_expenses(new_trip_id)
+    assert [(expense.name, expense.payer_name) for expense in expenses] == [
+        ('Hotel', 'Menon'), ('Boat', 'Nair'), ('Dinner', 'Menon')]
+    assert database.get_total_expenses(new_trip_id) == 450.0
+    assert database.get_expenses(trip_id) == []
+    assert database.diff_balance_tables() == []
+
+
+def test_activated_archive_replaces_the_active_trip(database, trip, tmp_path):
+    trip_id, _ = trip
+    new_trip_id = database.load_archived_trip(make_legacy_archive(tmp_path / 'legacy.db'))
+    assert database.get_active_trip_id() == new_trip_id
+    assert database.get_trip(trip_id).status == 'archived'
+
+
+def test_failed_import_rolls_back_everything(database, trip, tmp_path):
+    trip_id, _ = trip
+    database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', trip[1][0])
+    before = (trip_rows(database), database.get_family_details(), database.get_expenses(trip_id))
+    # Expenses without the columns the copy needs, so it fails after the
+    # active trip was ended and the new trip and families were written
+    archive = make_legacy_archive(tmp_path / 'bad.db', 'CREATE TABLE expenses (id INTEGER PRIMARY KEY, name TEXT);')
+
+    with pytest.raises(sqlite3.OperationalError):
+        database.import_archive(archive, activate=True)
+    assert (trip_rows(database), database.get_family_details(), database.get_expenses(trip_id)) == before
+    assert database.get_active_trip_id() == trip_id
+    assert database.diff_balance_tables() == []
+
+    # The archive was detached, so another import can attach one again
+    database.import_archive(make_legacy_archive(tmp_path / 'good.db'))
+
+
+def test_archive_without_a_trip_is_refused(database, trip, tmp_path):
+    path = str(tmp_path / 'empty.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_ARCHIVE_SCHEMA)
+    conn.close()
+    before = trip_rows(database)
+    with pytest.raises(ValueError):
+        database.import_archive(path)
+    assert trip_rows(database) == before
+
+
+def test_missing_archive_file(database, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        database.import_archive(str(tmp_path / 'missing.db'))
+
+
+@pytest.fixture
+def app_database(tmp_path):
+    """A tracker whose app keeps its database and archives in tmp_path."""
+    app = SimpleNamespace(paths=SimpleNamespace(app=str(tmp_path)))
+    database = ExpenseTracker(app)
+    yield database
+    database.close()
+
+
+def test_archive_holds_only_the_exported_trip(app_database):
+    database = app_database
+    database.save_trip('Big', '2024-01-01', 'Family', None, None, 0)
+    big_trip_id = database.get_active_trip_id()
+    database.save_family_details('A', 2, big_trip_id)
+    payer_id = database.get_family_id('A', big_trip_id)
+    database.import_expenses(
+        (big_trip_id, f'Expense {i}', 1.0, '2024-01-02', payer_id) for i in range(20000))
+    database.end_trip(big_trip_id)
+    database.save_trip('Small', '2024-02-01', 'Family', None, None, 0)
+    small_trip_id = database.get_active_trip_id()
+    database.save_family_details('B', 3, small_trip_id)
+
+    progress = []
+    archive_filename = database.archive_trip(big_trip_id, progress=lambda *step: progress.append(step))
+    # The copy ran in several steps and finished
+    assert len(progress) > 1
+    assert progress[-1][0] == progress[-1][1]
+
+    small_filename = database.archive_trip(small_trip_id)
+    assert small_filename != archive_filename
+    small_path = database.get_archive_path(small_filename)
+    # Pages freed by the other trip are not kept in the file
+    assert os.path.getsize(small_path) < os.path.getsize(database.get_archive_path(archive_filename)) / 10
+
+    conn = sqlite3.connect(small_path)
+    try:
+        assert conn.execute('SELECT id, name FROM trips').fetchall() == [(small_trip_id, 'Small')]
+        assert conn.execute('SELECT COUNT(*) FROM expenses').fetchone() == (0,)
+        assert conn.execute('SELECT family_name FROM family_details').fetchall() == [('B',)]
+        assert conn.execute('PRAGMA journal_mode').fetchone() == ('delete',)
+    finally:
+        conn.close()
+
+    # Exporting keeps the trips in the main database and records the archives
+    assert database.get_expense_count(big_trip_id) == 20000
+    assert database.conn.execute('SELECT trip_id, archive_path FROM archived_trips ORDER BY id').fetchall() == [
+        (big_trip_id, archive_filename), (small_trip_id, small_filename)]
+
+
+def test_archives_made_in_the_same_second_do_not_collide(app_database):
+    database = app_database
+    database.save_trip('Trip', '2024-01-01', 'Family', None, None, 0)
+    trip_id = database.get_active_trip_id()
+    filenames = {database.archive_trip(trip_id) for _ in range(3)}
+    assert len(filenames) == 3
+    assert all(os.path.exists(database.get_archive_path(filename)) for filename in filenames)
+
+
+def test_old_archive_files_are_migrated_on_startup(tmp_path):
+    app = SimpleNamespace(paths=SimpleNamespace(app=str(tmp_path)))
+    database = ExpenseTracker(app)
+    os.makedirs(tmp_path / 'archives', exist_ok=True)
+    make_legacy_archive(tmp_path / 'archives' / 'goa.db')
+    database.conn.executemany(
+        "INSERT INTO archived_trips (trip_name, archive_path, archived_date) VALUES (?, ?, ?)",
+        [('Goa', 'goa.db', '2023-05-10 09:00:00'), ('Gone', 'missing.db', '2023-06-01 09:00:00')])
+    database.conn.commit()
+    database.close()
+
+    database = ExpenseTracker(app)
+    try:
+        migrated = dict(database.conn.execute("SELECT trip_name, trip_id FROM archived_trips").fetchall())
+        assert migrated['Gone'] is None
+        trip = database.get_trip(migrated['Goa'])
+        assert (trip.name, trip.status, trip.ended_date) == ('Goa', 'archived', '2023-05-10 09:00:00')
+        assert database.get_expense_count(trip.id) == 3
+        assert database.get_active_trip_id() is None
+    finally:
+        database.close()
+
+    # Already migrated archives are not imported a second time
+    database = ExpenseTracker(app)
+    try:
+        assert database.conn.execute("SELECT COUNT(*) FROM trips").fetchone()[0] == 1
+    finally:
+        database.close()
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+
+
+def balance(database, family_id):
+    return database.conn.execute(
+        'SELECT paid, expense_count FROM family_balances WHERE family_id = ?', (family_id,)).fetchone()
+
+
+def totals(database, trip_id):
+    return database.conn.execute(
+        'SELECT total_expenses, expense_count, total_members, family_count FROM trip_totals WHERE trip_id = ?',
+        (trip_id,)).fetchone()
+
+
+def test_expense_writes_keep_totals_current(database, trip):
+    trip_id, (a, b) = trip
+    first = database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+    database.save_expense(trip_id, 'Food', 12.5, '2024-01-03', b)
+    assert balance(database, a) == (40.0, 1)
+    assert totals(database, trip_id) == (52.5, 2, 5, 2)
+
+    database.delete_expense(first)
+    assert balance(database, a) == (0, 0)
+    assert totals(database, trip_id) == (12.5, 1, 5, 2)
+    assert database.diff_balance_tables() == []
+
+
+def test_last_delete_resets_sums_exactly(database, trip):
+    trip_id, (a, _) = trip
+    ids = [database.save_expense(trip_id, 'Snack', 0.1, '2024-01-02', a) for _ in range(3)]
+    for expense_id in ids:
+        database.delete_expense(expense_id)
+    # 0.1 + 0.1 + 0.1 - 0.1 - 0.1 - 0.1 is not 0.0 in floating point
+    assert balance(database, a) == (0, 0)
+    assert totals(database, trip_id)[:2] == (0, 0)
+
+
+def test_updates_move_amounts_between_families(database, trip):
+    trip_id, (a, b) = trip
+    expense_id = database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+    database.conn.execute('UPDATE expenses SET payer_id = ?, amount = 30 WHERE id = ?', (b, expense_id))
+    database.update_family_record(b, 'B', 4)
+    assert balance(database, a) == (0, 0)
+    assert balance(database, b) == (30.0, 1)
+    assert totals(database, trip_id) == (30.0, 1, 6, 2)
+    assert database.diff_balance_tables() == []
+
+
+def test_family_and_trip_deletes(database, trip):
+    trip_id, (a, b) = trip
+    database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+    database.delete_family_record(b)
+    assert balance(database, b) is None
+    assert totals(database, trip_id)[2:] == (2, 1)
+
+    database.delete_trip(trip_id)
+    assert totals(database, trip_id) is None
+    assert database.diff_balance_tables() == []
+
+
+def test_rebuild_repairs_drift(database, trip):
+    trip_id, (a, _) = trip
+    database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+    database.conn.execute('UPDATE family_balances SET paid = 99 WHERE family_id = ?', (a,))
+    database.conn.commit()
+
+    differences = database.rebuild_balance_tables()
+    assert [(table, key) for table, key, _, _ in differences] == [('family_balances', a)]
+    assert database.diff_balance_tables() == []
+    assert balance(database, a) == (40.0, 1)
+
+
+@pytest.mark.parametrize('amount', [float('nan'), float('inf'), float('-inf')])
+def test_non_finite_amounts_are_refused(database, trip, amount):
+    trip_id, (a, _) = trip
+    kept = database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+    assert database.save_expense(trip_id, 'Broken', amount, '2024-01-02', a) is False
+    with pytest.raises(sqlite3.IntegrityError):
+        database.conn.execute('UPDATE expenses SET amount = ? WHERE id = ?', (amount, kept))
+    database.conn.rollback()
+
+    # The good row can still be deleted and the totals add up
+    database.delete_expense(kept)
+    assert totals(database, trip_id)[:2] == (0, 0)
+    assert database.diff_balance_tables() == []
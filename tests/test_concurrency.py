@@ -0,0 +1,60 @@
+import random
+import threading
+
+from expensetracker.database import ExpenseTracker
+
+READERS = 4
+WRITES = 300
+
+
+def test_readers_and_writer_share_one_database(db_path, trip):
+    trip_id, families = trip
+    database = ExpenseTracker(db_path=db_path, query_cache_bytes=1024 * 1024)
+    errors = []
+    reads = [0] * READERS
+    stop = threading.Event()
+
+    def reader(number):
+        try:
+            while not stop.is_set():
+                page = database.get_expenses_page(trip_id, limit=50)
+                assert all(expense.trip_id == trip_id for expense in page)
+                database.get_expense_count(trip_id)
+                database.get_settlement_service(trip_id).balances()
+                database.get_trip_snapshot(trip_id)
+                database.settle_expenses(trip_id)
+                reads[number] += 1
+        except Exception as e:
+            errors.append(('reader', number, repr(e)))
+
+    def writer():
+        rng = random.Random(0)
+        try:
+            for i in range(WRITES):
+                database.save_expense(
+                    trip_id, f'Expense {i}', round(rng.uniform(1, 100), 2), f'2024-01-{i % 28 + 1:02d}',
+                    rng.choice(families))
+                if i % 7 == 0:
+                    database.delete_expense(database.get_expenses_page(trip_id, limit=1)[0].id)
+        except Exception as e:
+            errors.append(('writer', repr(e)))
+
+    readers = [threading.Thread(target=reader, args=(number,)) for number in range(READERS)]
+    writer_thread = threading.Thread(target=writer)
+    try:
+        for thread in readers:
+            thread.start()
+        writer_thread.start()
+        writer_thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+        assert errors == []
+        assert all(reads)
+        assert database.diff_balance_tables() == []
+        expected = WRITES - len(range(0, WRITES, 7))
+        assert database.get_expense_count(trip_id) == expected
+    finally:
+        stop.set()
+        database.close()
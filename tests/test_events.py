@@ -0,0 +1,111 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from expensetracker.async_database import AsyncExpenseTracker
+from expensetracker.observable import ExpenseAdded, ExpensesReset, Observer, TripSwitched
+from expensetracker.write_queue import WriteQueue
+
+
+class Collector(Observer):
+    def __init__(self):
+        self.updates = []
+
+    def update(self, events=()):
+        self.updates.append(list(events))
+
+
+class Recorder(Observer):
+    """Records each update with the expense count another connection sees."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.updates = []
+
+    def update(self, events=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            count = conn.execute('SELECT COUNT(*) FROM expenses').fetchone()[0]
+        finally:
+            conn.close()
+        self.updates.append((list(events), count))
+
+
+@pytest.fixture
+def recorder(database, db_path):
+    recorder = Recorder(db_path)
+    database.events.add_observer(recorder)
+    return recorder
+
+
+def test_queued_batch_is_reported_after_commit(database, db_path, trip, recorder):
+    trip_id, (a, b) = trip
+    recorder.updates.clear()
+    async_database = AsyncExpenseTracker(db_path=db_path, events=database.events)
+    write_queue = WriteQueue(async_database)
+    try:
+        write_queue.submit('save_expense', trip_id, 'Fuel', 40.0, '2024-01-02', a)
+        write_queue.submit('save_expense', trip_id, 'Food', 10.0, '2024-01-02', b)
+        write_queue.flush().result()
+    finally:
+        write_queue.close()
+        async_database.close()
+
+    [(events, count)] = recorder.updates
+    assert [type(event) for event in events] == [ExpenseAdded, ExpenseAdded]
+    assert count == 2
+
+
+def test_rolled_back_writes_are_not_reported(database, trip, recorder):
+    trip_id, (a, _) = trip
+    recorder.updates.clear()
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+            raise RuntimeError
+    assert recorder.updates == []
+
+
+def test_rolled_back_savepoint_drops_only_its_events(database, trip, recorder):
+    trip_id, (a, _) = trip
+    recorder.updates.clear()
+    with database.transaction():
+        kept = database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+        with pytest.raises(RuntimeError):
+            with database.transaction():
+                database.save_expense(trip_id, 'Food', 10.0, '2024-01-02', a)
+                raise RuntimeError
+        assert recorder.updates == []
+    [(events, count)] = recorder.updates
+    assert events == [ExpenseAdded(kept, trip_id, a, 40.0)]
+    assert count == 1
+
+
+def test_uncoalesced_observers_see_writes_inside_the_transaction(database, trip):
+    trip_id, (a, _) = trip
+    collector = Collector()
+    database.events.add_observer(collector, coalesce=False)
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+            assert [type(event) for [event] in collector.updates] == [ExpenseAdded]
+            raise RuntimeError
+    assert collector.updates[-1] == [ExpensesReset(None)]
+
+
+def test_coalesced_events_are_delivered_once_per_loop_turn(database):
+    collector = Collector()
+    database.events.add_observer(collector)
+    loop = asyncio.new_event_loop()
+    database.events.loop = loop
+    try:
+        database.events.notify_observers(TripSwitched(1), ExpensesReset(1))
+        database.events.notify_observers(TripSwitched(2), TripSwitched(1))
+        assert collector.updates == []
+        loop.run_until_complete(asyncio.sleep(0))
+    finally:
+        database.events.loop = None
+        loop.close()
+    # Repeats count once, at their last position
+    assert collector.updates == [[ExpensesReset(1), TripSwitched(2), TripSwitched(1)]]
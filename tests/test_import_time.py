@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# Modules that only the screens need; importing the main screen must not pull them in
+SCREEN_MODULES = [
+    'expensetracker.expense_entry',
+    'expensetracker.settlement',
+    'expensetracker.settlement_details',
+    'expensetracker.reporting',
+    'expensetracker.trips',
+    'expensetracker.trip_history',
+    'expensetracker.sources',
+    'expensetracker.strategy_picker',
+]
+
+# Ceiling for importing the main screen, in microseconds. It takes a few
+# milliseconds once toga and asyncio are out of the picture; the headroom
+# is for slow CI.
+MAIN_IMPORT_CEILING_US = 100_000
+
+# Loaded before the timed import: toga needs asyncio anyway, so its cost is
+# not the main screen's
+PRELOADED_MODULES = ['asyncio']
+
+# The parts of toga the main screen touches while it is imported. Measuring
+# against these keeps the timing about our own modules, whichever toga and
+# backend are (or are not) installed.
+TOGA_STAND_IN = {
+    'toga/__init__.py': 'class App:\n    pass\n\n\nclass MainWindow:\n    pass\n',
+    'toga/style/__init__.py': 'class Pack:\n    pass\n',
+    'toga/style/pack.py': "COLUMN = 'column'\nROW = 'row'\n",
+    'toga/widgets/__init__.py': '',
+    'toga/widgets/box.py': '',
+    'toga/widgets/button.py': '',
+    'toga/widgets/label.py': '',
+}
+
+
+def import_times(module, extra_path=(), preload=()):
+    """Return {module: cumulative microseconds} from ``python -X importtime``.
+
+    Modules in ``preload`` are imported first, so they are not counted.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(list(extra_path) + [SRC] + [path for path in sys.path if path])
+    code = ''.join(f'import {name}; ' for name in preload) + f'import {module}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, cwd=SRC, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_screen_import_is_cheap(tmp_path):
+    for name, source in TOGA_STAND_IN.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+
+    times = import_times('expensetracker.main', extra_path=[str(tmp_path)], preload=PRELOADED_MODULES)
+    assert times['expensetracker.main'] < MAIN_IMPORT_CEILING_US
+    assert [module for module in SCREEN_MODULES if module in times] == []
+    # Nor the database layer; screens open it through the app
+    assert 'expensetracker.database' not in times
@@ -0,0 +1,140 @@
+import json
+
+import pytest
+
+from expensetracker.importer import export_expense_file, import_expense_file, import_expense_rows
+from expensetracker.observable import ExpensesReset, Observer
+
+
+def write_csv(path, lines):
+    path.write_text('name,amount,date,payer\n' + ''.join(line + '\n' for line in lines), encoding='utf-8')
+    return str(path)
+
+
+def write_ndjson(path, rows):
+    path.write_text(''.join((row if isinstance(row, str) else json.dumps(row)) + '\n' for row in rows),
+                    encoding='utf-8')
+    return str(path)
+
+
+def saved(database, trip_id):
+    return [(expense.name, expense.amount, expense.date, expense.payer_name)
+            for expense in database.get_expenses(trip_id)]
+
+
+def test_csv_import(database, trip, tmp_path):
+    trip_id, _ = trip
+    path = write_csv(tmp_path / 'expenses.csv', ['Fuel,40,2024-01-02,A', 'Food,12.5,2024-01-03,B'])
+    report = import_expense_file(database, path)
+    assert report.ok and report.imported == 2
+    assert saved(database, trip_id) == [('Fuel', 40.0, '2024-01-02', 'A'), ('Food', 12.5, '2024-01-03', 'B')]
+    assert database.diff_balance_tables() == []
+
+
+def test_ndjson_import(database, trip, tmp_path):
+    trip_id, _ = trip
+    path = write_ndjson(tmp_path / 'expenses.ndjson', [
+        {'name': 'Fuel', 'amount': 40, 'date': '2024-01-02', 'payer': 'A'},
+        '',
+        {'name': 'Food', 'amount': '12.5', 'date': '2024-01-03', 'payer': 'B'},
+    ])
+    report = import_expense_file(database, path, trip_id=trip_id)
+    assert report.ok and report.imported == 2
+    assert saved(database, trip_id) == [('Fuel', 40.0, '2024-01-02', 'A'), ('Food', 12.5, '2024-01-03', 'B')]
+
+
+def test_row_errors_carry_line_numbers(database, trip, tmp_path):
+    trip_id, _ = trip
+    path = write_csv(tmp_path / 'expenses.csv', [
+        'Fuel,40,2024-01-02,A',
+        'Food,abc,2024-01-03,B',
+        'Hotel,nan,2024-01-03,B',
+        'Taxi,inf,2024-01-03,B',
+        'Museum,10,03/01/2024,A',
+        ',10,2024-01-03,A',
+        'Lunch,-5,2024-01-03,A',
+    ])
+    report = import_expense_file(database, path)
+    assert report.imported == 1
+    assert [line for line, _ in report.errors] == [3, 4, 5, 6, 7, 8]
+    assert report.errors[0][1] == "Amount must be a valid number"
+    assert report.errors[3][1] == "Date must be in YYYY-MM-DD format"
+    assert [name for name, _, _, _ in saved(database, trip_id)] == ['Fuel']
+
+    path = write_ndjson(tmp_path / 'expenses.ndjson', ['not json', '[1, 2]'])
+    report = import_expense_file(database, path)
+    assert [line for line, _ in report.errors] == [1, 2]
+
+
+def test_unknown_payers_are_reported(database, trip, tmp_path):
+    trip_id, _ = trip
+    path = write_csv(tmp_path / 'expenses.csv', ['Fuel,40,2024-01-02,Nobody', 'Food,10,2024-01-02,A'])
+    report = import_expense_file(database, path)
+    assert report.imported == 1
+    assert report.errors == [(2, "Unknown payer family: Nobody")]
+
+
+def test_unsupported_files_and_missing_trip(database, tmp_path):
+    with pytest.raises(ValueError):
+        import_expense_file(database, str(tmp_path / 'expenses.xlsx'))
+    with pytest.raises(ValueError):
+        import_expense_file(database, write_csv(tmp_path / 'expenses.csv', []))
+
+
+class Collector(Observer):
+    def __init__(self):
+        self.events = []
+
+    def update(self, events=()):
+        self.events.extend(events)
+
+
+@pytest.mark.parametrize('rows, chunk_size, chunks', [(0, 3, 0), (5, 5, 1), (6, 5, 2), (7, 3, 3)])
+def test_import_expenses_commits_per_chunk(database, trip, rows, chunk_size, chunks):
+    trip_id, (a, _) = trip
+    collector = Collector()
+    database.events.add_observer(collector)
+    imported = database.import_expenses(
+        ((trip_id, f'Expense {i}', 1.0, '2024-01-02', a) for i in range(rows)), chunk_size)
+    assert imported == rows
+    assert database.get_expense_count(trip_id) == rows
+    assert collector.events == [ExpensesReset(trip_id)] * chunks
+
+
+def test_failed_chunk_is_reported_and_import_goes_on(database, trip):
+    trip_id, _ = trip
+    database.conn.execute('''
+        CREATE TEMP TRIGGER refuse_boom BEFORE INSERT ON expenses WHEN NEW.name = 'Boom'
+        BEGIN SELECT RAISE(ABORT, 'boom'); END
+    ''')
+    rows = [(line, {'name': name, 'amount': '1', 'date': '2024-01-02', 'payer': 'A'})
+            for line, name in enumerate(['One', 'Two', 'Three', 'Boom', 'Five', 'Six'], start=2)]
+    report = import_expense_rows(database, rows, trip_id, chunk_size=2)
+    # The chunk holding Boom is rolled back as a whole; the others are kept
+    assert report.imported == 4
+    assert [line for line, _ in report.errors] == [4, 5]
+    assert all('boom' in message for _, message in report.errors)
+    assert [name for name, _, _, _ in saved(database, trip_id)] == ['One', 'Two', 'Five', 'Six']
+    assert database.diff_balance_tables() == []
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.ndjson', '.jsonl'])
+def test_export_import_round_trip(database, trip, tmp_path, extension):
+    trip_id, (a, b) = trip
+    database.import_expenses([
+        (trip_id, 'Fuel, diesel', 40.25, '2024-01-02', a),
+        (trip_id, 'Café "Rio"', 12.5, '2024-01-03', b),
+        (trip_id, 'Hotel', 300.0, '2024-01-03', a),
+    ])
+    path = str(tmp_path / f'expenses{extension}')
+    assert export_expense_file(database, path, chunk_size=2) == 3
+
+    database.end_trip(trip_id)
+    database.save_trip('Copy', '2024-02-01', 'Family', None, None, 0)
+    copy_id = database.get_active_trip_id()
+    assert copy_id != trip_id
+    database.save_family_details('A', 2, copy_id)
+    database.save_family_details('B', 3, copy_id)
+    report = import_expense_file(database, path, trip_id=copy_id)
+    assert report.ok and report.imported == 3
+    assert saved(database, copy_id) == saved(database, trip_id)
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+from expensetracker.database import ExpenseTracker
+from expensetracker.migrations import BASE_SCHEMA, LATEST_VERSION, get_schema_version
+
+
+def query_plan(database, query, params=()):
+    rows = database.conn.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()
+    return ' '.join(row[-1] for row in rows)
+
+
+def test_new_database_is_at_latest_version(database):
+    assert get_schema_version(database.conn) == LATEST_VERSION
+    assert database.conn.execute('PRAGMA user_version').fetchone()[0] == LATEST_VERSION
+
+
+@pytest.mark.parametrize('query, params, index', [
+    ('SELECT * FROM expenses WHERE trip_id = ?', (1,), 'idx_expenses_trip_id'),
+    ('SELECT SUM(amount) FROM expenses WHERE trip_id = ?', (1,), 'idx_expenses_trip_id'),
+    ("SELECT id FROM trips WHERE status = 'active'", (), 'idx_trips_status'),
+    ('SELECT * FROM family_details WHERE trip_id = ?', (1,), 'idx_family_details_trip_id'),
+    ('SELECT id FROM family_details WHERE family_name = ? AND trip_id = ?', ('A', 1), 'idx_family_details_'),
+    ('SELECT id FROM family_details WHERE family_name = ?', ('A',), 'idx_family_details_family_name'),
+])
+def test_lookups_use_indexes(database, query, params, index):
+    plan = query_plan(database, query, params)
+    assert index in plan
+    assert 'SCAN' not in plan
+
+
+def test_baseline_database_is_upgraded(db_path):
+    # A database as the first release left it: no indexes, no user_version,
+    # and families saved against trip 1 whatever the active trip was
+    conn = sqlite3.connect(db_path)
+    for statement in BASE_SCHEMA:
+        conn.execute(statement)
+    conn.execute("INSERT INTO trips (id, name, status) VALUES (1, 'Old', 'ended'), (2, 'New', 'active')")
+    conn.execute("INSERT INTO family_details (id, family_name, num_members, trip_id) VALUES (1, 'A', 2, 1)")
+    conn.execute("INSERT INTO expenses (trip_id, name, amount, payer_id) VALUES (2, 'Fuel', 40, 1), (2, 'Food', 2.5, 1)")
+    conn.commit()
+    conn.close()
+
+    database = ExpenseTracker(db_path=db_path)
+    try:
+        assert get_schema_version(database.conn) == LATEST_VERSION
+        indexes = {row[0] for row in database.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_expenses_trip_id', 'idx_trips_status', 'idx_family_details_trip_id',
+                'idx_family_details_family_name', 'idx_expenses_trip_date_id'} <= indexes
+        # Data survives, and the totals tables are filled from it
+        assert database.conn.execute('SELECT trip_id FROM family_details WHERE id = 1').fetchone() == (2,)
+        assert database.conn.execute(
+            'SELECT total_expenses, expense_count, total_members FROM trip_totals WHERE trip_id = 2'
+        ).fetchone() == (42.5, 2, 2)
+        assert database.diff_balance_tables() == []
+    finally:
+        database.close()
+
+
+def test_current_database_is_left_alone(db_path):
+    ExpenseTracker(db_path=db_path).close()
+    conn = sqlite3.connect(db_path)
+    schema = conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall()
+    conn.close()
+
+    database = ExpenseTracker(db_path=db_path)
+    try:
+        assert database.conn.execute('SELECT sql FROM sqlite_master ORDER BY name').fetchall() == schema
+        assert get_schema_version(database.conn) == LATEST_VERSION
+    finally:
+        database.close()
@@ -0,0 +1,51 @@
+import pytest
+
+
+@pytest.fixture
+def expenses(database, trip):
+    """A trip with 50 expenses over a few dates, some without a date."""
+    trip_id, (a, b) = trip
+    database.import_expenses(
+        (trip_id, f'Expense {i}', i + 1, None if i % 10 == 0 else f'2024-01-{i % 7 + 1:02d}', (a, b)[i % 2])
+        for i in range(50))
+    rows = database.conn.execute(
+        'SELECT date, id FROM expenses WHERE trip_id = ? ORDER BY date, id', (trip_id,)).fetchall()
+    return trip_id, rows
+
+
+def walk(database, trip_id, limit):
+    pages, after = [], None
+    while True:
+        page = database.get_expenses_page(trip_id, after=after, limit=limit)
+        if not page:
+            return pages
+        pages.append(page)
+        after = (page[-1].date, page[-1].id)
+
+
+@pytest.mark.parametrize('limit', [1, 7, 50, 100])
+def test_pages_cover_every_row_once_in_order(database, expenses, limit):
+    trip_id, rows = expenses
+    pages = walk(database, trip_id, limit)
+    assert all(len(page) <= limit for page in pages)
+    assert [(expense.date, expense.id) for page in pages for expense in page] == rows
+
+
+def test_paging_can_start_part_way(database, expenses):
+    trip_id, rows = expenses
+    for position in (0, 4, 5, 23, 49):
+        assert database.get_expense_key_at(trip_id, position) == rows[position]
+        assert database.get_expense_position(trip_id, rows[position]) == position
+        page = database.get_expenses_page(trip_id, after=rows[position], limit=3)
+        assert [(expense.date, expense.id) for expense in page] == rows[position + 1:position + 4]
+    assert database.get_expense_key_at(trip_id, len(rows)) is None
+
+
+def test_pages_seek_on_the_covering_index(database, expenses):
+    trip_id, rows = expenses
+    plan = database.conn.execute(
+        'EXPLAIN QUERY PLAN SELECT date, id FROM expenses WHERE trip_id = ? AND (date, id) > (?, ?) '
+        'ORDER BY date, id LIMIT 10', (trip_id,) + rows[10]).fetchall()
+    plan = ' '.join(row[-1] for row in plan)
+    assert 'idx_expenses_trip_date_id' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,141 @@
+import sqlite3
+
+from expensetracker.cache import QueryCache, _estimate_size
+from expensetracker.database import ExpenseTracker
+from expensetracker.observable import Observer, TripChanged, TripSwitched
+
+
+def test_least_recently_used_entry_is_evicted():
+    row = [(1, 'x')]
+    cache = QueryCache(max_bytes=_estimate_size(row) * 2)
+    cache.put('a', row, ('expenses',))
+    cache.put('b', row, ('expenses',))
+    cache.get('a')
+    cache.put('c', row, ('expenses',))
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, row)
+    assert cache.get('c') == (True, row)
+    assert cache.evictions == 1
+    assert cache.current_bytes <= cache.max_bytes
+
+
+def test_invalidation_only_drops_dependent_entries():
+    cache = QueryCache()
+    cache.put('trips', [1], ('trips',))
+    cache.put('expenses', [2], ('expenses', 'family_details'))
+    cache.invalidate('family_details')
+    assert cache.get('expenses') == (False, None)
+    assert cache.get('trips') == (True, [1])
+
+
+def test_results_larger_than_the_cap_are_not_cached():
+    cache = QueryCache(max_bytes=64)
+    cache.put('big', list(range(100)), ('expenses',))
+    assert cache.get('big') == (False, None)
+    assert cache.current_bytes == 0
+
+
+def test_tracker_writes_invalidate_cached_reads(db_path, trip):
+    trip_id, (a, _) = trip
+    database = ExpenseTracker(db_path=db_path, query_cache_bytes=1024 * 1024)
+    try:
+        assert database.get_expense_count(trip_id) == 0
+        assert database.get_expense_count(trip_id) == 0
+        assert database.query_cache.hits == 1
+
+        database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+        assert database.get_expense_count(trip_id) == 1
+        # Unrelated tables stay cached
+        database.get_active_trip_id()
+        hits = database.query_cache.hits
+        database.save_expense(trip_id, 'Food', 10.0, '2024-01-02', a)
+        assert database.get_active_trip_id() == trip_id
+        assert database.query_cache.hits == hits + 1
+    finally:
+        database.close()
+
+
+def test_commits_from_other_connections_clear_the_cache(db_path, trip):
+    trip_id, (a, _) = trip
+    database = ExpenseTracker(db_path=db_path, query_cache_bytes=1024 * 1024)
+    try:
+        assert database.get_expense_count(trip_id) == 0
+        other = sqlite3.connect(db_path)
+        other.execute("INSERT INTO expenses (trip_id, name, amount, date, payer_id) VALUES (?, 'x', 1, '2024-01-02', ?)",
+                      (trip_id, a))
+        other.commit()
+        other.close()
+        assert database.get_expense_count(trip_id) == 1
+    finally:
+        database.close()
+
+
+class Collector(Observer):
+    def __init__(self):
+        self.events = []
+
+    def update(self, events=()):
+        self.events.extend(events)
+
+
+def test_reads_inside_a_write_method_see_the_write(db_path, trip):
+    trip_id, _ = trip
+    database = ExpenseTracker(db_path=db_path, query_cache_bytes=1024 * 1024)
+    collector = Collector()
+    database.events.add_observer(collector)
+    try:
+        assert database.get_active_trip_id() == trip_id
+        database.end_trip(trip_id)
+        # end_trip reads the active trip after ending it
+        assert [(type(event), event) for event in collector.events] == [
+            (TripChanged, TripChanged(trip_id)), (TripSwitched, TripSwitched(None))]
+        assert database.get_active_trip_id() is None
+    finally:
+        database.close()
+
+
+def test_family_renames_reach_cached_expense_reads(db_path, trip):
+    trip_id, (a, _) = trip
+    database = ExpenseTracker(db_path=db_path, query_cache_bytes=1024 * 1024)
+    try:
+        database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+        assert database.get_expenses(trip_id)[0].payer_name == 'A'
+        expense_id = database.get_expenses(trip_id)[0].id
+        assert database.get_expense(expense_id).payer_name == 'A'
+        database.update_family_record(a, 'Renamed', 2)
+        assert database.get_expenses(trip_id)[0].payer_name == 'Renamed'
+        assert database.get_expense(expense_id).payer_name == 'Renamed'
+    finally:
+        database.close()
+
+
+def test_trip_snapshot_is_reused_until_a_write(database, trip):
+    trip_id, (a, _) = trip
+    database.save_expense(trip_id, 'Fuel', 40.0, '2024-01-02', a)
+    snapshot = database.get_trip_snapshot()
+    assert database.get_trip_snapshot() is snapshot
+    assert database.get_trip_snapshot(trip_id) is not snapshot
+    assert database.get_trip_snapshot(strategy='minimal') is not snapshot
+    assert database.get_trip_snapshot() is snapshot
+
+    database.save_expense(trip_id, 'Food', 10.0, '2024-01-02', a)
+    rebuilt = database.get_trip_snapshot()
+    assert rebuilt is not snapshot
+    assert rebuilt.total_expenses == 50.0
+    assert database.get_trip_snapshot() is rebuilt
+
+
+def test_trip_snapshot_is_rebuilt_after_another_connection_commits(database, db_path, trip):
+    trip_id, (a, _) = trip
+    snapshot = database.get_trip_snapshot()
+    assert not snapshot.total_expenses
+
+    other = sqlite3.connect(db_path)
+    other.execute("INSERT INTO expenses (trip_id, name, amount, date, payer_id) VALUES (?, 'x', 25, '2024-01-02', ?)",
+                  (trip_id, a))
+    other.commit()
+    other.close()
+
+    rebuilt = database.get_trip_snapshot()
+    assert rebuilt is not snapshot
+    assert rebuilt.total_expenses == 25.0
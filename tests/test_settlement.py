@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from expensetracker.settlement_engine import (
+    SETTLEMENT_STRATEGIES, compute_balances, greedy_settlement, minimal_settlement, settle)
+
+
+def remaining(balances, transactions):
+    """Balances left after applying the transfers, rounded to cents."""
+    left = dict(balances)
+    for payer, receiver, amount in transactions:
+        left[payer] += amount
+        left[receiver] -= amount
+    return {name: round(amount, 2) for name, amount in left.items()}
+
+
+def random_balances(count, seed):
+    rng = random.Random(seed)
+    amounts = [rng.randint(-5000, 5000) / 100 for _ in range(count - 1)]
+    amounts.append(-round(sum(amounts), 2))
+    return [(f'F{i}', amount) for i, amount in enumerate(amounts)]
+
+
+def test_compute_balances_splits_per_head():
+    balances = compute_balances([('A', 2, 100.0), ('B', 3, 0.0)], 100.0, 5)
+    assert balances == [('A', 60.0), ('B', -60.0)]
+    assert compute_balances([('A', 2, 0.0)], None, 2) == [('A', 0.0)]
+
+
+@pytest.mark.parametrize('strategy', sorted(SETTLEMENT_STRATEGIES))
+@pytest.mark.parametrize('seed', range(5))
+def test_every_strategy_settles_all_balances(strategy, seed):
+    balances = random_balances(9, seed)
+    transactions = settle(balances, strategy)
+    assert all(amount > 0 for _, _, amount in transactions)
+    assert all(abs(amount) < 0.02 for amount in remaining(balances, transactions).values())
+
+
+def test_minimal_uses_no_more_transfers_than_greedy():
+    for seed in range(20):
+        balances = random_balances(8, seed)
+        assert len(minimal_settlement(balances)) <= len(greedy_settlement(balances))
+
+
+def test_minimal_finds_groups_that_cancel_out():
+    # Greedy in family order needs 3 transfers; the pairs need only 2
+    balances = [('A', -10.0), ('B', -20.0), ('C', 20.0), ('D', 10.0)]
+    assert len(greedy_settlement(balances)) == 3
+    transactions = minimal_settlement(balances)
+    assert sorted(transactions) == [('A', 'D', 10.0), ('B', 'C', 20.0)]
+
+
+def test_minimal_falls_back_when_out_of_time():
+    balances = random_balances(12, 0)
+    transactions = minimal_settlement(balances, time_budget=0)
+    assert all(abs(amount) < 0.02 for amount in remaining(balances, transactions).values())
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        settle([('A', 0.0)], 'cheapest')
+
+
+def test_tracker_settlements_follow_writes(database, trip):
+    trip_id, (a, b) = trip
+    database.save_expense(trip_id, 'Fuel', 50.0, '2024-01-02', a)
+    assert database.settle_expenses(trip_id) == [('B', 'A', 30.0)]
+    database.save_expense(trip_id, 'Hotel', 50.0, '2024-01-02', b)
+    assert [tuple(s) for s in database.settle_expenses(trip_id, 'minimal')] == [('B', 'A', 10.0)]
@@ -0,0 +1,85 @@
+import sqlite3
+import time
+
+import pytest
+
+from expensetracker.database import ExpenseTracker
+from expensetracker.migrations import BASE_SCHEMA, LATEST_VERSION, bootstrap_schema, get_schema_version
+
+# Generous ceiling for opening an up-to-date database, in seconds;
+# a current schema costs one PRAGMA read, so this is mostly connection setup
+STARTUP_BUDGET = 0.05
+
+
+def traced_bootstrap(conn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    bootstrap_schema(conn)
+    conn.set_trace_callback(None)
+    return [statement.strip().rstrip(';').upper() for statement in statements]
+
+
+def assert_single_transaction(statements):
+    control = [statement for statement in statements
+               if statement.startswith(('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE'))]
+    assert control == ['BEGIN', 'COMMIT']
+    assert statements.index('BEGIN') == 1  # after the user_version read
+    assert statements[-1] == 'COMMIT'
+
+
+def test_opening_a_current_database_is_fast(db_path):
+    ExpenseTracker(db_path=db_path).close()
+    timings = []
+    for _ in range(10):
+        start = time.perf_counter()
+        database = ExpenseTracker(db_path=db_path)
+        database.get_active_trip()
+        database.close()
+        timings.append(time.perf_counter() - start)
+    assert sorted(timings)[len(timings) // 2] < STARTUP_BUDGET
+
+
+def test_current_schema_costs_one_read(db_path):
+    ExpenseTracker(db_path=db_path).close()
+    conn = sqlite3.connect(db_path)
+    try:
+        assert traced_bootstrap(conn) == ['PRAGMA USER_VERSION']
+    finally:
+        conn.close()
+
+
+def test_fresh_database_is_created_in_one_transaction(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        assert_single_transaction(traced_bootstrap(conn))
+        assert get_schema_version(conn) == LATEST_VERSION
+    finally:
+        conn.close()
+
+
+def test_legacy_database_is_upgraded_in_one_transaction(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        for statement in BASE_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        assert_single_transaction(traced_bootstrap(conn))
+        assert get_schema_version(conn) == LATEST_VERSION
+    finally:
+        conn.close()
+
+
+def test_failed_upgrade_leaves_the_schema_untouched(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        for statement in BASE_SCHEMA:
+            conn.execute(statement)
+        # Migration 2 adds this column, so the upgrade fails part-way
+        conn.execute('ALTER TABLE trips ADD COLUMN ended_date TEXT')
+        conn.commit()
+        with pytest.raises(sqlite3.Error):
+            bootstrap_schema(conn)
+        assert get_schema_version(conn) == 0
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type IN ('index', 'trigger')").fetchone() == (0,)
+    finally:
+        conn.close()
@@ -0,0 +1,81 @@
+import pytest
+
+from expensetracker.observable import Observer, TripChanged, TripSwitched
+
+
+class Collector(Observer):
+    def __init__(self):
+        self.events = []
+
+    def update(self, events=()):
+        self.events.extend((type(event), event) for event in events)
+
+
+@pytest.fixture
+def collector(database):
+    collector = Collector()
+    database.events.add_observer(collector)
+    return collector
+
+
+def add_trip(database, name, family_names=('A', 'B')):
+    database.save_trip(name, '2024-01-01', 'Family', None, None, 0)
+    trip_id = database.get_active_trip_id()
+    for family_name in family_names:
+        database.save_family_details(family_name, 2, trip_id)
+    payer_id = database.get_family_id(family_names[0], trip_id)
+    database.save_expense(trip_id, f'{name} hotel', 100.0, '2024-01-02', payer_id)
+    return trip_id
+
+
+def test_end_trip_keeps_its_data(database, collector):
+    trip_id = add_trip(database, 'Goa')
+    collector.events.clear()
+    database.end_trip(trip_id)
+
+    trip = database.get_trip(trip_id)
+    assert trip.status == 'archived' and trip.ended_date
+    assert database.get_active_trip_id() is None
+    assert database.get_expense_count(trip_id) == 1
+    assert len(database.get_family_details(trip_id)) == 2
+    assert [row[0] for row in database.get_ended_trips()] == [trip_id]
+    assert collector.events == [(TripChanged, TripChanged(trip_id)), (TripSwitched, TripSwitched(None))]
+
+
+def test_reactivate_trip_ends_the_current_one(database, collector):
+    first = add_trip(database, 'Goa')
+    database.end_trip(first)
+    second = add_trip(database, 'Ooty')
+    collector.events.clear()
+
+    database.reactivate_trip(first)
+    assert database.get_active_trip_id() == first
+    assert database.get_trip(first).ended_date is None
+    assert database.get_trip(second).status == 'archived'
+    assert collector.events == [(TripSwitched, TripSwitched(first))]
+
+
+def test_reactivate_unknown_trip_changes_nothing(database, collector):
+    trip_id = add_trip(database, 'Goa')
+    collector.events.clear()
+    with pytest.raises(ValueError):
+        database.reactivate_trip(trip_id + 100)
+    assert database.get_active_trip_id() == trip_id
+    assert database.get_trip(trip_id).status == 'active'
+    assert collector.events == []
+
+
+def test_delete_trip_removes_only_that_trip(database):
+    first = add_trip(database, 'Goa')
+    database.end_trip(first)
+    second = add_trip(database, 'Ooty')
+
+    database.delete_trip(second)
+    assert database.get_trip(second) is None
+    assert database.get_expense_count(second) == 0
+    assert database.get_family_details(second) == []
+    assert database.get_active_trip_id() is None
+
+    assert database.get_expense_count(first) == 1
+    assert len(database.get_family_details(first)) == 2
+    assert database.diff_balance_tables() == []